@@ -0,0 +1,270 @@
+"""The goal in this module is to represent the Boolean functions of formulas as reduced ordered binary decision
+diagrams (ROBDDs).
+
+A BDD node tests one variable and has two children: low, for when the variable is false, and high, for when it is
+true. Variables are tested in the same order on every path, and no node is redundant or duplicated, so every
+Boolean function has exactly one BDD for a given variable order. All nodes live in a manager:
+
+    manager = BDD()
+    f = manager.from_formula(Implies(Atom('p'), Atom('q')))
+    g = manager.from_formula(Or(Not(Atom('p')), Atom('q')))
+    f is g                       # True: equivalent formulas have the same node
+    manager.count(f)             # 3 models over the atoms p and q
+
+Once BDDs are built, equivalence is a comparison of nodes, validity and unsatisfiability are comparisons with
+the terminals manager.true and manager.false, and counting and listing models take time linear in the size
+of the BDD (plus the size of the output), however many queries are made.
+
+Nodes are hash-consed in a unique table, in the same way as formulas (see formula.py), and the results of
+ITE, the operation all others are built on, are kept in a computed cache. The unique table only keeps the nodes
+that are still used, so nodes are collected once no BDD refers to them and they are not in the computed cache;
+garbage_collect empties the cache.
+"""
+
+from itertools import product
+from weakref import WeakValueDictionary
+
+from formula import *
+from functions import postorder
+
+# number of entries of the computed cache of a manager; the cache is emptied when it gets full.
+CACHE_SIZE = 1 << 18
+
+
+class Node:
+    """A BDD node. level is the position in the variable order of the variable it tests.
+    Nodes must be created by the methods of a BDD manager."""
+
+    __slots__ = ('level', 'low', 'high', '__weakref__')
+
+    def __init__(self, level, low, high):
+        self.level = level
+        self.low = low
+        self.high = high
+
+
+def variable_order(formulas, heuristic='appearance'):
+    """Returns a list with the names of the atoms of formulas, in an order for the variables of a BDD.
+    heuristic is one of:
+        'appearance': the order of the first occurrence in a depth-first traversal, which keeps atoms that occur
+                      close together in the formula close together in the order;
+        'frequency':  atoms in more subformulas first (ties broken by appearance);
+        'sorted':     alphabetical order of the names."""
+
+    if isinstance(formulas, Formula):
+        formulas = [formulas]
+    appearance = {}
+    occurrences = {}
+    for formula in formulas:
+        for current in postorder(formula):
+            if isinstance(current, Atom):
+                appearance.setdefault(current.name, len(appearance))
+                occurrences.setdefault(current.name, 0)
+            for arg in current.args:
+                if isinstance(arg, Atom):
+                    occurrences[arg.name] += 1
+    if heuristic == 'appearance':
+        return sorted(appearance, key=appearance.get)
+    if heuristic == 'frequency':
+        return sorted(appearance, key=lambda name: (-occurrences[name], appearance[name]))
+    if heuristic == 'sorted':
+        return sorted(appearance, key=str)
+    raise ValueError('unknown variable order heuristic: ' + str(heuristic))
+
+
+class BDD:
+    """A manager of reduced ordered BDDs over a growing list of variables (atom names).
+    order is an initial list of variables; atoms that are not in it are appended to the order when they are
+    first used, in the order given by heuristic (see variable_order)."""
+
+    def __init__(self, order=(), heuristic='appearance', cache_size=CACHE_SIZE):
+        self.order = []
+        self.levels = {}  # name -> level
+        self.heuristic = heuristic
+        self.cache_size = cache_size
+        self.unique_table = WeakValueDictionary()
+        self.computed = {}
+        self.false = Node(float('inf'), None, None)
+        self.true = Node(float('inf'), None, None)
+        self.declare(order)
+
+    def __len__(self):
+        """Returns the number of nodes (not counting the terminals) that are still in use."""
+        return len(self.unique_table)
+
+    def declare(self, names):
+        """Appends the variables that are not declared yet to the end of the order."""
+        for name in names:
+            if name not in self.levels:
+                self.levels[name] = len(self.order)
+                self.order.append(name)
+
+    def node(self, level, low, high):
+        """Returns the node that tests the variable of level, with children low and high."""
+        if low is high:
+            return low
+        key = (level, low, high)
+        node = self.unique_table.get(key)
+        if node is None:
+            node = self.unique_table[key] = Node(level, low, high)
+        return node
+
+    def var(self, name):
+        """Returns the BDD of the atom name."""
+        self.declare([name])
+        return self.node(self.levels[name], self.false, self.true)
+
+    # ---- operations ----
+
+    def ite(self, f, g, h):
+        """Returns the BDD of if f then g else h, that is, (f ∧ g) ∨ (¬f ∧ h)."""
+        true, false = self.true, self.false
+        computed = self.computed
+        results = []
+        stack = [(f, g, h, None)]
+        while stack:
+            f, g, h, level = stack.pop()
+            if level is not None:  # both cofactors are computed
+                high = results.pop()
+                low = results.pop()
+                result = self.node(level, low, high)
+                if len(computed) >= self.cache_size:
+                    computed.clear()
+                computed[(f, g, h)] = result
+                results.append(result)
+                continue
+            if f is true or g is h:
+                results.append(g)
+                continue
+            if f is false:
+                results.append(h)
+                continue
+            if g is true and h is false:
+                results.append(f)
+                continue
+            result = computed.get((f, g, h))
+            if result is not None:
+                results.append(result)
+                continue
+            level = min(f.level, g.level, h.level)
+            f0, f1 = (f.low, f.high) if f.level == level else (f, f)
+            g0, g1 = (g.low, g.high) if g.level == level else (g, g)
+            h0, h1 = (h.low, h.high) if h.level == level else (h, h)
+            stack.append((f, g, h, level))
+            stack.append((f1, g1, h1, None))
+            stack.append((f0, g0, h0, None))
+        return results[0]
+
+    def negation(self, f):
+        return self.ite(f, self.false, self.true)
+
+    def conjunction(self, f, g):
+        return self.ite(f, g, self.false)
+
+    def disjunction(self, f, g):
+        return self.ite(f, self.true, g)
+
+    def implication(self, f, g):
+        return self.ite(f, g, self.true)
+
+    def from_formula(self, formula):
+        """Returns the BDD of formula. Its atoms that are not variables of the manager yet are declared first."""
+        self.declare(variable_order(formula, self.heuristic))
+        bdds = {}
+        for current in postorder(formula):
+            if isinstance(current, Atom):
+                result = self.var(current.name)
+            elif isinstance(current, Not):
+                result = self.negation(bdds[current.inner])
+            elif isinstance(current, Implies):
+                result = self.implication(bdds[current.left], bdds[current.right])
+            else:
+                combine = self.conjunction if isinstance(current, And) else self.disjunction
+                args = iter(current.args)
+                result = bdds[next(args)]
+                for arg in args:
+                    result = combine(result, bdds[arg])
+            bdds[current] = result
+        return bdds[formula]
+
+    def garbage_collect(self):
+        """Empties the computed cache, so that the nodes only kept by it are freed.
+        Returns the number of nodes still in use."""
+        self.computed.clear()
+        return len(self.unique_table)
+
+    # ---- queries ----
+
+    def nodes(self, f):
+        """Returns the list of the nodes of the BDD f (terminals included), each one after its children."""
+        order = []
+        visited = set()
+        stack = [(f, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in visited:
+                continue
+            if expanded or node.low is None:
+                visited.add(node)
+                order.append(node)
+                continue
+            stack.append((node, True))
+            stack.append((node.high, False))
+            stack.append((node.low, False))
+        return order
+
+    def support(self, f):
+        """Returns the set of the names of the variables that f depends on."""
+        return {self.order[node.level] for node in self.nodes(f) if node.low is not None}
+
+    def _levels(self, atoms, f):
+        """Returns the sorted levels of the atoms, checking that they include the support of f."""
+        if atoms is None:
+            return sorted(self.levels[name] for name in self.support(f))
+        levels = sorted({self.levels[name] for name in atoms if name in self.levels})
+        if not {node.level for node in self.nodes(f) if node.low is not None} <= set(levels):
+            raise ValueError('the atoms must include every variable the BDD depends on')
+        return levels + [float('inf')] * (len(set(atoms)) - len(levels))  # atoms unknown to the manager are free
+
+    def count(self, f, atoms=None):
+        """Returns the number of models of f over the atoms (by default, the variables f depends on)."""
+        levels = self._levels(atoms, f)
+        rank = {level: k for k, level in enumerate(levels)}  # position of a level among the counted ones
+        rank[float('inf')] = len(levels)
+        counts = {self.false: 0, self.true: 1}
+        for node in self.nodes(f):
+            if node.low is None:
+                continue
+            k = rank[node.level]
+            counts[node] = (counts[node.low] << (rank[node.low.level] - k - 1)) + \
+                           (counts[node.high] << (rank[node.high.level] - k - 1))
+        return counts[f] << rank[f.level]
+
+    def models(self, f, atoms=None):
+        """Yields the models of f as dictionaries over the atoms (by default, the variables f depends on)."""
+        if atoms is None:
+            atoms = [self.order[level] for level in self._levels(None, f)]
+        else:
+            atoms = list(atoms)
+            self._levels(atoms, f)
+        stack = [(f, {})]
+        while stack:
+            node, path = stack.pop()
+            if node is self.false:
+                continue
+            if node is self.true:
+                free = [name for name in atoms if name not in path]
+                for values in product((False, True), repeat=len(free)):
+                    model = dict(path)
+                    model.update(zip(free, values))
+                    yield {name: model[name] for name in atoms}
+                continue
+            name = self.order[node.level]
+            stack.append((node.high, {**path, name: True}))
+            stack.append((node.low, {**path, name: False}))
+
+    def is_valid(self, f):
+        return f is self.true
+
+    def is_satisfiable(self, f):
+        return f is not self.false
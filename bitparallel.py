@@ -0,0 +1,134 @@
+"""The goal in this module is to evaluate a formula in many interpretations at once.
+
+The interpretations of the atoms p0, p1, ..., pn-1 (in this order) are numbered from 0 to 2**n - 1:
+in interpretation i, atom pj is false if bit j of i is 1, and true otherwise, so interpretation 0
+assigns true to every atom. A set of interpretations is represented by a Python integer used as a
+bit vector (a mask), and the formula is evaluated over a whole block of interpretations at a time with
+the bitwise operations &, | and ^ on those integers, instead of once per interpretation.
+
+For example, with atoms ['p', 'q'] the interpretations are 0: p and q true, 1: p false, 2: q false and
+3: both false. The mask of p is 0b0101, the mask of q is 0b0011 and the mask of (p ∧ q) is
+0b0101 & 0b0011 = 0b0001, that is, interpretation 0 is the only model of (p ∧ q).
+"""
+
+from formula import *
+from functions import atoms as atoms_of
+from postfix import ATOM, NOT, AND, OR, compile_postfix
+
+# the formula is evaluated over blocks of 2**BLOCK_BITS interpretations.
+BLOCK_BITS = 16
+
+
+def _repeat(pattern, period, size):
+    """Returns the integer with size bits obtained by repeating a pattern of period bits."""
+    return pattern * (((1 << size) - 1) // ((1 << period) - 1))
+
+
+def _false_lanes(j, size):
+    """Returns the mask of the interpretations, among the first 2**size, in which atom j is false."""
+    half = 1 << j
+    return _repeat(((1 << half) - 1) << half, 2 * half, 1 << size)
+
+
+def model_masks(formula, atoms=None, block_bits=None):
+    """Yields pairs (first, mask) covering all interpretations of the atoms, block by block:
+    bit k of mask is 1 if and only if interpretation first + k is a model of formula.
+    atoms is the list that fixes the numbering of the interpretations (by default, the sorted atoms of formula);
+    it must contain every atom of formula. Blocks have 2**block_bits interpretations (by default, 2**BLOCK_BITS)."""
+
+    if block_bits is None:
+        block_bits = BLOCK_BITS
+    if atoms is None:
+        atoms = sorted(atoms_of(formula))
+    program = compile_postfix(formula)
+    position = {name: j for j, name in enumerate(atoms)}
+    slots = [position[str(name)] for name in program.atoms]
+
+    n = len(atoms)
+    size = min(n, block_bits)
+    full = (1 << (1 << size)) - 1
+    low_lanes = [full ^ _false_lanes(j, size) for j in range(size)]  # true lanes of the atoms inside a block
+
+    # value of each instruction is released after its last use, to keep memory low in big blocks.
+    last_use = list(range(len(program)))
+    for i in range(len(program)):
+        if program.opcodes[i] != ATOM:
+            for j in range(program.starts[i], program.starts[i + 1]):
+                last_use[program.operands[j]] = i
+
+    for block in range(1 << (n - size)):
+        first = block << size
+        lanes = [low_lanes[j] if j < size else (0 if (first >> j) & 1 else full) for j in range(n)]
+        yield first, _run(program, [lanes[slot] for slot in slots], full, last_use)
+
+
+def _run(program, values, full, last_use):
+    opcodes = program.opcodes
+    operands = program.operands
+    starts = program.starts
+    results = [0] * len(opcodes)
+    for i, opcode in enumerate(opcodes):
+        start, end = starts[i], starts[i + 1]
+        if opcode == ATOM:
+            results[i] = values[operands[start]]
+            continue
+        if opcode == NOT:
+            value = results[operands[start]] ^ full
+        elif opcode == AND:
+            value = results[operands[start]]
+            for j in range(start + 1, end):
+                value &= results[operands[j]]
+        elif opcode == OR:
+            value = results[operands[start]]
+            for j in range(start + 1, end):
+                value |= results[operands[j]]
+        else:
+            value = (results[operands[start]] ^ full) | results[operands[start + 1]]
+        results[i] = value
+        for j in range(start, end):
+            if last_use[operands[j]] == i:
+                results[operands[j]] = None
+    return results[-1]
+
+
+def truth_table(formula, atoms=None):
+    """Returns the mask of the models of formula over all 2**n interpretations of its n atoms.
+    Intended for formulas with few atoms; the mask has 2**n bits."""
+    table = 0
+    for first, mask in model_masks(formula, atoms):
+        table |= mask << first
+    return table
+
+
+def count_models_bitparallel(formula, atoms=None):
+    """Returns the number of interpretations of the atoms (by default, the atoms of formula) that satisfy formula."""
+    return sum(bin(mask).count('1') for _, mask in model_masks(formula, atoms))
+
+
+def interpretation_of(index, atoms):
+    """Returns interpretation number index of the list of atoms as a dictionary."""
+    return {name: not (index >> j) & 1 for j, name in enumerate(atoms)}
+
+
+def all_models_bitparallel(formula, atoms=None):
+    """Yields, as dictionaries, the interpretations of the atoms (by default, the atoms of formula) that satisfy formula."""
+    if atoms is None:
+        atoms = sorted(atoms_of(formula))
+    for first, mask in model_masks(formula, atoms):
+        while mask:
+            low = mask & -mask
+            yield interpretation_of(first + low.bit_length() - 1, atoms)
+            mask ^= low
+
+
+def is_valid_bitparallel(formula):
+    """Returns True if every interpretation of the atoms of formula satisfies it."""
+    atoms = sorted(atoms_of(formula))
+    size = min(len(atoms), BLOCK_BITS)
+    full = (1 << (1 << size)) - 1
+    return all(mask == full for first, mask in model_masks(formula, atoms))
+
+
+def is_satisfiable_bitparallel(formula):
+    """Returns True if some interpretation of the atoms of formula satisfies it."""
+    return any(mask for first, mask in model_masks(formula))
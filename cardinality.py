@@ -0,0 +1,250 @@
+"""The goal in this module is to encode cardinality constraints, such as "at most k of these atoms are true",
+into clauses of linear (or almost linear) size, instead of the clauses of every subset of k + 1 atoms.
+
+The encodings of "at most k of x1, ..., xn" are
+    - 'pairwise': one clause (¬xi1 ∨ ... ∨ ¬xik+1) for each k + 1 literals; no auxiliary atoms, for small n;
+    - 'sequential': the sequential counter of Sinz, where auxiliary atom s(i, j) means that at least j of
+      x1, ..., xi are true; O(n·k) clauses;
+    - 'totalizer': the totalizer of Bailleux and Boufkhad, a tree that adds up the literals in unary, counting
+      only up to k + 1; O(n·k) clauses in practice, and few auxiliary atoms;
+    - 'commander': the commander encoding of Klieber and Kwon for k = 1, in which the literals are split into
+      groups of 3 and a commander atom of each group is true if some literal of the group is; O(n) clauses;
+    - 'network': a sorting network of Batcher (odd-even merge sort) that sorts the literals, so that at most k are
+      true if the output k + 1 is false; O(n·log²n) clauses, whatever k is.
+By default, an encoding is chosen from n and k. "At least k" is encoded as "at most n - k" of the negations,
+and "exactly k" as both.
+
+Each function has two forms: at_most_k(literals, k) receives formulas and returns a list of formulas (clauses),
+whose auxiliary atoms have fresh names such as '(card 1)'; at_most_k_clauses(literals, k, new_var) receives
+DIMACS literals (see cnf.py), returns a list of clauses of integers and gets auxiliary variables from new_var,
+for example cnf.new_var. For example,
+
+    cells = [Atom('1_1_' + str(n)) for n in range(1, 10)]
+    formulas = exactly_k(cells, 1)      # cell 1_1 has exactly one number
+
+The names of the auxiliary atoms are in parentheses, so no atom read by formula_parser.py has one of them.
+The auxiliary atoms are not always determined by the other ones (a commander atom, for example, may be true when
+no literal of its group is), so the models of the clauses are not the models of the constraint: all_models and
+count_models list or count each assignment of the auxiliary atoms as a different model. To get the models of the
+constraint, project them away, as in iter_models(formula, [a for a in atoms(formula) if not is_auxiliary(a)]).
+"""
+
+from itertools import combinations, count
+
+from formula import *
+
+ENCODINGS = ('pairwise', 'sequential', 'totalizer', 'commander', 'network')
+
+_aux_names = count(1)
+
+
+def is_auxiliary(atom):
+    """Returns True if atom (an Atom or an atom name) is an auxiliary atom of the constraints of this module."""
+    name = atom.name if isinstance(atom, Atom) else atom
+    return name.startswith('(card ')
+
+
+def _aux_atom():
+    return Atom('(card ' + str(next(_aux_names)) + ')')
+
+
+def choose_encoding(n, k):
+    """Returns the encoding used by default for "at most k" of n literals."""
+    if k == 1:
+        return 'pairwise' if n <= 6 else 'commander'
+    if n <= 5:
+        return 'pairwise'
+    if k * k <= 2 * n:  # small k: O(n·k) clauses
+        return 'sequential'
+    if k <= n.bit_length() ** 2:
+        return 'totalizer'
+    return 'network'
+
+
+# ---- encodings of "at most k" on DIMACS literals, with 1 <= k < n ----
+
+def _pairwise(literals, k, new_var):
+    return [[-literal for literal in subset] for subset in combinations(literals, k + 1)]
+
+
+def _sequential(literals, k, new_var):
+    n = len(literals)
+    s = [[new_var() for _ in range(k)] for _ in range(n - 1)]  # s[i][j]: at least j + 1 of literals[:i + 1] are true
+    clauses = [[-literals[0], s[0][0]]]
+    clauses.extend([-s[0][j]] for j in range(1, k))
+    for i in range(1, n - 1):
+        x = literals[i]
+        clauses.append([-x, s[i][0]])
+        clauses.append([-s[i - 1][0], s[i][0]])
+        for j in range(1, k):
+            clauses.append([-x, -s[i - 1][j - 1], s[i][j]])
+            clauses.append([-s[i - 1][j], s[i][j]])
+        clauses.append([-x, -s[i - 1][k - 1]])
+    clauses.append([-literals[n - 1], -s[n - 2][k - 1]])
+    return clauses
+
+
+def totalizer(literals, k, new_var):
+    """Returns the clauses of a totalizer of the DIMACS literals, counting up to k + 1, and its outputs:
+    outputs[j] is true if at least j + 1 of the literals are true (but not the other way around),
+    for j < min(len(literals), k + 1)."""
+    clauses = []
+    nodes = [[literal] for literal in literals]  # unary counters: node[i] is true if the count is at least i + 1
+    while len(nodes) > 1:
+        merged = []
+        for a, b in zip(nodes[0::2], nodes[1::2]):
+            size = min(len(a) + len(b), k + 1)
+            r = [new_var() for _ in range(size)]
+            for i in range(len(a) + 1):
+                for j in range(len(b) + 1):
+                    if 0 < i + j <= size:
+                        clause = [r[i + j - 1]]
+                        if i:
+                            clause.append(-a[i - 1])
+                        if j:
+                            clause.append(-b[j - 1])
+                        clauses.append(clause)
+            merged.append(r)
+        if len(nodes) % 2:
+            merged.append(nodes[-1])
+        nodes = merged
+    return clauses, nodes[0]
+
+
+def _totalizer(literals, k, new_var):
+    clauses, outputs = totalizer(literals, k, new_var)
+    return clauses + [[-outputs[k]]]
+
+
+def _commander(literals, k, new_var, group=3):
+    clauses = []
+    while len(literals) > group + 1:
+        commanders = []
+        for start in range(0, len(literals), group):
+            members = literals[start:start + group]
+            clauses.extend(_pairwise(members, 1, new_var))
+            commander = new_var()
+            clauses.extend([-member, commander] for member in members)
+            commanders.append(commander)
+        literals = commanders
+    clauses.extend(_pairwise(literals, 1, new_var))
+    return clauses
+
+
+def _network(literals, k, new_var):
+    n = 1
+    while n < len(literals):
+        n *= 2
+    wires = list(literals)
+    clauses = []
+    if n > len(wires):
+        false = new_var()
+        clauses.append([-false])
+        wires.extend([false] * (n - len(wires)))
+    # Batcher's odd-even merge sort; each comparator puts the larger value (true) in the first wire.
+    p = 1
+    while p < n:
+        step = p
+        while step >= 1:
+            for j in range(step % p, n - step, 2 * step):
+                for i in range(min(step, n - j - step)):
+                    if (i + j) // (2 * p) == (i + j + step) // (2 * p):
+                        a, b = wires[i + j], wires[i + j + step]
+                        high, low = new_var(), new_var()
+                        clauses.extend(([-a, high], [-b, high], [-a, -b, low]))
+                        wires[i + j], wires[i + j + step] = high, low
+            step //= 2
+        p *= 2
+    clauses.append([-wires[k]])
+    return clauses
+
+
+_ENCODERS = {'pairwise': _pairwise, 'sequential': _sequential, 'totalizer': _totalizer,
+             'commander': _commander, 'network': _network}
+
+
+def at_most_k_clauses(literals, k, new_var, encoding=None):
+    """Returns clauses (lists of integers) stating that at most k of the DIMACS literals are true.
+    new_var() must return a new variable each time it is called. encoding is one of ENCODINGS,
+    or None to choose one from the number of literals and k (see choose_encoding)."""
+    literals = list(literals)
+    n = len(literals)
+    if k < 0:
+        return [[]]
+    if k >= n:
+        return []
+    if k == 0:
+        return [[-literal] for literal in literals]
+    if encoding is None:
+        encoding = choose_encoding(n, k)
+    if encoding == 'commander' and k != 1:
+        raise ValueError('the commander encoding is only for at most one literal')
+    if encoding not in _ENCODERS:
+        raise ValueError('unknown cardinality encoding: ' + str(encoding))
+    return _ENCODERS[encoding](literals, k, new_var)
+
+
+def at_least_k_clauses(literals, k, new_var, encoding=None):
+    """Returns clauses stating that at least k of the DIMACS literals are true (see at_most_k_clauses)."""
+    literals = list(literals)
+    if k == 1:
+        return [literals]
+    return at_most_k_clauses([-literal for literal in literals], len(literals) - k, new_var, encoding)
+
+
+def exactly_k_clauses(literals, k, new_var, encoding=None):
+    """Returns clauses stating that exactly k of the DIMACS literals are true (see at_most_k_clauses)."""
+    literals = list(literals)
+    return at_most_k_clauses(literals, k, new_var, encoding) + at_least_k_clauses(literals, k, new_var, encoding)
+
+
+# ---- the same constraints on formulas ----
+
+def _negation(formula):
+    return formula.inner if isinstance(formula, Not) else Not(formula)
+
+
+def _on_formulas(encode, formulas, k, encoding, auxiliary):
+    formulas = list(formulas)
+    variables = {}  # formula -> variable
+    for formula in formulas:
+        variables.setdefault(formula, len(variables) + 1)
+    literal_of = {variable: formula for formula, variable in variables.items()}
+    next_variable = count(len(variables) + 1)
+    clauses = encode([variables[formula] for formula in formulas], k, lambda: next(next_variable), encoding)
+
+    def formula_of(literal):
+        if abs(literal) not in literal_of:
+            literal_of[abs(literal)] = _aux_atom()
+            if auxiliary is not None:
+                auxiliary.append(literal_of[abs(literal)])
+        formula = literal_of[abs(literal)]
+        return formula if literal > 0 else _negation(formula)
+
+    result = []
+    for clause in clauses:
+        if not clause:  # the constraint is unsatisfiable
+            atom = _aux_atom()
+            if auxiliary is not None:
+                auxiliary.append(atom)
+            result.append(And(atom, Not(atom)))
+        else:
+            result.append(or_all([formula_of(literal) for literal in clause]))
+    return result
+
+
+def at_most_k(formulas, k, encoding=None, auxiliary=None):
+    """Returns a list of clauses (formulas) stating that at most k of the formulas are true.
+    See at_most_k_clauses for the encodings. The auxiliary atoms are fresh (see is_auxiliary) and, if auxiliary
+    is a list, they are appended to it, so that the models can be projected onto the other atoms."""
+    return _on_formulas(at_most_k_clauses, formulas, k, encoding, auxiliary)
+
+
+def at_least_k(formulas, k, encoding=None, auxiliary=None):
+    """Returns a list of clauses (formulas) stating that at least k of the formulas are true (see at_most_k)."""
+    return _on_formulas(at_least_k_clauses, formulas, k, encoding, auxiliary)
+
+
+def exactly_k(formulas, k, encoding=None, auxiliary=None):
+    """Returns a list of clauses (formulas) stating that exactly k of the formulas are true (see at_most_k)."""
+    return _on_formulas(exactly_k_clauses, formulas, k, encoding, auxiliary)
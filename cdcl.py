@@ -0,0 +1,698 @@
+"""The goal in this module is to decide the satisfiability of sets of clauses with a
+conflict-driven clause learning (CDCL) SAT solver.
+
+Clauses are given with the integer literals of the DIMACS format (see cnf.py), for example
+
+    solver = Solver()
+    solver.add_clause([1, -2])
+    solver.add_clause([2, 3])
+    if solver.solve():
+        print(solver.model)   # for example, [1, -2, 3]
+
+The solver is incremental: clauses can be added between calls to solve, learned clauses are kept, and
+solve accepts assumptions, literals that are taken as true for that call only. For example,
+solver.solve([-1, -3]) returns False, and solver.core is then a subset of the assumptions, here [-1, -3],
+that already makes the clauses unsatisfiable.
+
+The solver implements the usual techniques of modern SAT solvers:
+    - unit propagation with two watched literals per clause;
+    - conflict analysis that learns the first unique implication point (1UIP) clause, which is then minimised;
+    - VSIDS branching (variables in recent conflicts are preferred) with phase saving;
+    - restarts following the Luby sequence;
+    - periodic deletion of learned clauses with high literal block distance (LBD) and low activity.
+
+Besides clauses, the solver accepts native linear pseudo-Boolean constraints w1·l1 + ... + wn·ln >= k, where
+the li are literals and the wi positive integers, and cardinality constraints ("at least k", "at most k" or
+"exactly k" of the literals), which are the case where every wi is 1. For example, solver.add_at_most([1, 2, 3], 1)
+states that at most one of 1, 2 and 3 is true, without the auxiliary variables of the encodings of
+cardinality.py. Each constraint keeps a counter, its slack: the total weight of its literals that are not false
+minus k. Each literal of the constraint is watched; when it becomes false, its weight is taken from the slack,
+a negative slack is a conflict, and every unassigned literal whose weight is larger than the slack is implied.
+The clause that explains an implication or a conflict (the implied literal and enough false literals) is only
+built when conflict analysis needs it.
+
+Internally, literal v is coded as 2 * v and literal -v as 2 * v + 1, so the negation of a code is code ^ 1.
+"""
+
+TRUE = 1
+FALSE = -1
+UNASSIGNED = 0
+
+
+def luby(i):
+    """Returns the i-th element (starting at 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ..."""
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        power -= 1
+        i = i % size
+    return 1 << power
+
+
+class Clause:
+    __slots__ = ('lits', 'learnt', 'activity', 'lbd', 'deleted')
+
+    def __init__(self, lits, learnt=False, lbd=0):
+        self.lits = lits
+        self.learnt = learnt
+        self.activity = 0.0
+        self.lbd = lbd
+        self.deleted = False
+
+
+class Constraint:
+    """The pseudo-Boolean constraint sum(weights[i] * lits[i]) >= bound, over literal codes, with the weights
+    in decreasing order."""
+    __slots__ = ('lits', 'weights', 'bound', 'slack')
+
+    def __init__(self, lits, weights, bound):
+        self.lits = lits
+        self.weights = weights
+        self.bound = bound
+        self.slack = sum(weights) - bound
+
+    def explain(self, value, position, code=None):
+        """Returns the clause (list of literal codes) that explains why code is true (code first), or, if code is
+        None, why the constraint is false: the heaviest literals that were false before code, enough of them to
+        leave less than bound (plus the weight of code) to the other literals."""
+        false = []
+        weight_of_code = 0
+        for lit, weight in zip(self.lits, self.weights):
+            if lit == code:
+                weight_of_code = weight
+            elif value[lit] == FALSE and (code is None or position[lit >> 1] < position[code >> 1]):
+                false.append((-weight, position[lit >> 1], lit))
+        false.sort()
+        clause = [] if code is None else [code]
+        excess = sum(self.weights) - self.bound - weight_of_code  # weight that may be false without consequences
+        for weight, _, lit in false:
+            clause.append(lit)
+            excess += weight
+            if excess < 0:
+                break
+        return clause
+
+
+class Solver:
+    """A CDCL SAT solver over clauses of integer literals.
+
+    restarts is 'luby' (the default), 'geometric' or None (no restarts), and restart_base is the
+    number of conflicts of the first restart interval.
+    """
+
+    def __init__(self, restarts='luby', restart_base=100, var_decay=0.95, clause_decay=0.999):
+        self.num_vars = 0
+        self.ok = True  # becomes False once the clauses are found unsatisfiable at level 0
+        self.clauses = []
+        self.learnts = []
+        self.value = [UNASSIGNED, UNASSIGNED]  # indexed by literal code
+        self.level = [0]
+        self.reason = [None]
+        self.position = [0]  # index of the assignment of each variable in the trail
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.watches = [[], []]
+        self.constraints = []
+        self.pb_watches = [[], []]  # literal code -> (constraint, weight) of the constraints in which it occurs
+        self.pb_head = 0  # number of literals of the trail whose constraints have been updated
+        self.seen = [False]
+        self.activity = [0.0]
+        self.polarity = [False]  # saved phase of each variable
+        self.heap = []
+        self.heap_index = [-1]
+        self.var_inc = 1.0
+        self.var_decay = var_decay
+        self.clause_inc = 1.0
+        self.clause_decay = clause_decay
+        self.restarts = restarts
+        self.restart_base = restart_base
+        self.max_learnts = 0
+        self.model = None
+        self.core = None
+        self.assumptions = []  # DIMACS literals
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    # ---- variables and clauses ----
+
+    def new_var(self):
+        """Creates a new variable and returns it."""
+        self.num_vars += 1
+        self.value.extend((UNASSIGNED, UNASSIGNED))
+        self.level.append(0)
+        self.reason.append(None)
+        self.position.append(0)
+        self.watches.extend(([], []))
+        self.pb_watches.extend(([], []))
+        self.seen.append(False)
+        self.activity.append(0.0)
+        self.polarity.append(False)
+        self.heap_index.append(-1)
+        self._heap_insert(self.num_vars)
+        return self.num_vars
+
+    def _ensure_var(self, variable):
+        while self.num_vars < variable:
+            self.new_var()
+
+    def add_clause(self, clause):
+        """Adds a clause, given as a sequence of DIMACS literals, to the solver.
+        Returns False if the clauses became unsatisfiable (the clause is empty after removing false literals)."""
+        if not self.ok:
+            return False
+        if self.trail_lim:
+            self._cancel_until(0)
+        lits = set()
+        for literal in clause:
+            variable = abs(literal)
+            self._ensure_var(variable)
+            code = 2 * variable + (literal < 0)
+            if code ^ 1 in lits or self.value[code] == TRUE:
+                return True  # tautology or satisfied clause
+            if self.value[code] == UNASSIGNED:
+                lits.add(code)
+        lits = list(lits)
+        if not lits:
+            self.ok = False
+            return False
+        if len(lits) == 1:
+            self._assign(lits[0], None)
+            if self._propagate() is not None:
+                self.ok = False
+            return self.ok
+        self._attach(Clause(lits))
+        return True
+
+    def add_clauses(self, clauses):
+        for clause in clauses:
+            self.add_clause(clause)
+        return self.ok
+
+    def add_pb(self, literals, weights, bound):
+        """Adds the constraint weights[0]·literals[0] + ... + weights[n-1]·literals[n-1] >= bound, where literals
+        are DIMACS literals and weights are integers, to the solver. Returns False if the clauses and constraints
+        became unsatisfiable."""
+        if not self.ok:
+            return False
+        if self.trail_lim:
+            self._cancel_until(0)
+        coefficients = {}  # variable -> weight of its positive literal
+        for literal, weight in zip(literals, weights):
+            self._ensure_var(abs(literal))
+            if literal < 0:  # w·¬x = w - w·x
+                bound -= weight
+                weight = -weight
+            coefficients[abs(literal)] = coefficients.get(abs(literal), 0) + weight
+        terms = []
+        for variable, weight in coefficients.items():
+            code = 2 * variable
+            if weight < 0:  # w·x = w + |w|·¬x
+                bound -= weight
+                code, weight = code + 1, -weight
+            if weight == 0 or self.value[code] == FALSE:
+                continue
+            if self.value[code] == TRUE:
+                bound -= weight
+                continue
+            terms.append((weight, code))
+        if bound <= 0:
+            return True
+        terms = [(min(weight, bound), code) for weight, code in terms]  # a weight larger than bound counts as bound
+        terms.sort(reverse=True)
+        if sum(weight for weight, _ in terms) < bound:
+            self.ok = False
+            return False
+        if terms[-1][0] == bound:  # any one literal is enough: a clause
+            return self.add_clause([_dimacs(code) for _, code in terms])
+        constraint = Constraint([code for _, code in terms], [weight for weight, _ in terms], bound)
+        self.constraints.append(constraint)
+        for weight, code in terms:
+            self.pb_watches[code].append((constraint, weight))
+        for weight, code in terms:
+            if weight <= constraint.slack:
+                break
+            self._assign(code, None)
+        if self._propagate() is not None:
+            self.ok = False
+        return self.ok
+
+    def add_at_least(self, literals, k):
+        """Adds the constraint that at least k of the DIMACS literals are true."""
+        return self.add_pb(literals, [1] * len(literals), k)
+
+    def add_at_most(self, literals, k):
+        """Adds the constraint that at most k of the DIMACS literals are true."""
+        return self.add_pb([-literal for literal in literals], [1] * len(literals), len(literals) - k)
+
+    def add_exactly(self, literals, k):
+        """Adds the constraint that exactly k of the DIMACS literals are true."""
+        return self.add_at_least(literals, k) and self.add_at_most(literals, k)
+
+    def _attach(self, clause):
+        lits = clause.lits
+        self.watches[lits[0]].append(clause)
+        self.watches[lits[1]].append(clause)
+        if clause.learnt:
+            self.learnts.append(clause)
+        else:
+            self.clauses.append(clause)
+
+    # ---- assignment and propagation ----
+
+    def _assign(self, code, reason):
+        self.value[code] = TRUE
+        self.value[code ^ 1] = FALSE
+        variable = code >> 1
+        self.level[variable] = len(self.trail_lim)
+        self.reason[variable] = reason
+        self.position[variable] = len(self.trail)
+        self.trail.append(code)
+
+    def _propagate(self):
+        """Propagates the assignments of the trail. Returns a conflicting clause, or None."""
+        value = self.value
+        watches = self.watches
+        pb_watches = self.pb_watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            self.pb_head = self.qhead
+            if pb_watches[false_lit]:
+                conflict = self._propagate_constraints(false_lit)
+                if conflict is not None:
+                    self.qhead = len(trail)
+                    return conflict
+            watchers = watches[false_lit]
+            i = j = 0
+            end = len(watchers)
+            while i < end:
+                clause = watchers[i]
+                i += 1
+                if clause.deleted:
+                    continue
+                lits = clause.lits
+                if lits[0] == false_lit:
+                    lits[0], lits[1] = lits[1], false_lit
+                first = lits[0]
+                if value[first] == TRUE:
+                    watchers[j] = clause
+                    j += 1
+                    continue
+                for k in range(2, len(lits)):
+                    if value[lits[k]] != FALSE:
+                        lits[1] = lits[k]
+                        lits[k] = false_lit
+                        watches[lits[1]].append(clause)
+                        break
+                else:
+                    watchers[j] = clause
+                    j += 1
+                    if value[first] == FALSE:
+                        while i < end:
+                            watchers[j] = watchers[i]
+                            j += 1
+                            i += 1
+                        del watchers[j:]
+                        self.qhead = len(trail)
+                        return clause
+                    self._assign(first, clause)
+            del watchers[j:]
+        return None
+
+    def _propagate_constraints(self, false_lit):
+        """Takes the weight of false_lit from the slack of the constraints in which it occurs and assigns the
+        literals they imply. Returns the clause that explains a conflict, or None."""
+        value = self.value
+        conflict = None
+        for constraint, weight in self.pb_watches[false_lit]:  # every slack is updated, even after a conflict
+            constraint.slack -= weight
+        for constraint, weight in self.pb_watches[false_lit]:
+            slack = constraint.slack
+            if slack < 0:
+                conflict = Clause(constraint.explain(value, self.position))
+                break
+            if slack < constraint.weights[0]:
+                for lit, lit_weight in zip(constraint.lits, constraint.weights):
+                    if lit_weight <= slack:
+                        break
+                    if value[lit] == UNASSIGNED:
+                        self._assign(lit, constraint)
+        return conflict
+
+    def _reason(self, variable):
+        """Returns the clause that implied variable, building it first if a constraint implied it."""
+        reason = self.reason[variable]
+        if isinstance(reason, Constraint):
+            code = 2 * variable + (self.value[2 * variable] == FALSE)
+            reason = self.reason[variable] = Clause(reason.explain(self.value, self.position, code))
+        return reason
+
+    def _cancel_until(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        value = self.value
+        polarity = self.polarity
+        heap_index = self.heap_index
+        start = self.trail_lim[level]
+        for code in self.trail[start:self.pb_head]:
+            for constraint, weight in self.pb_watches[code ^ 1]:
+                constraint.slack += weight
+        self.pb_head = min(self.pb_head, start)
+        for code in self.trail[start:]:
+            variable = code >> 1
+            value[code] = value[code ^ 1] = UNASSIGNED
+            self.reason[variable] = None
+            polarity[variable] = not (code & 1)
+            if heap_index[variable] < 0:
+                self._heap_insert(variable)
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def implied(self, literals):
+        """Returns the list of the DIMACS literals that unit propagation derives from the clauses and the given
+        literals (the given literals included), or None if it finds a conflict. Nothing is learned, and
+        the solver is back at level 0 afterwards."""
+        if not self.ok:
+            return None
+        self._cancel_until(0)
+        for literal in literals:
+            self._ensure_var(abs(literal))
+            code = 2 * abs(literal) + (literal < 0)
+            if self.value[code] == TRUE:
+                continue
+            if self.value[code] == FALSE:
+                self._cancel_until(0)
+                return None
+            self.trail_lim.append(len(self.trail))
+            self._assign(code, None)
+            if self._propagate() is not None:
+                self._cancel_until(0)
+                return None
+        result = [_dimacs(code) for code in self.trail]
+        self._cancel_until(0)
+        return result
+
+    # ---- conflict analysis ----
+
+    def _analyze(self, conflict):
+        """Returns the learned 1UIP clause (asserting literal first), the backjump level and the LBD of the clause."""
+        seen = self.seen
+        level = self.level
+        trail = self.trail
+        current_level = len(self.trail_lim)
+        learnt = [0]
+        to_clear = []
+        counter = 0
+        code = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            if clause.learnt:
+                self._bump_clause(clause)
+            for q in (clause.lits if code is None else clause.lits[1:]):
+                variable = q >> 1
+                if not seen[variable] and level[variable] > 0:
+                    seen[variable] = True
+                    to_clear.append(variable)
+                    self._bump_var(variable)
+                    if level[variable] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            code = trail[index]
+            index -= 1
+            clause = self._reason(code >> 1)
+            seen[code >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = code ^ 1
+
+        # minimisation: a literal is redundant if the other literals of its reason are in the clause (or at level 0).
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            clause = self._reason(q >> 1)
+            if clause is None or any(not seen[r >> 1] and level[r >> 1] > 0 for r in clause.lits[1:]):
+                kept.append(q)
+        learnt = kept
+        for variable in to_clear:
+            seen[variable] = False
+
+        if len(learnt) == 1:
+            return learnt, 0, 1
+        best = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        lbd = len({level[q >> 1] for q in learnt})
+        return learnt, level[learnt[1] >> 1], lbd
+
+    # ---- VSIDS ----
+
+    def _bump_var(self, variable):
+        activity = self.activity
+        activity[variable] += self.var_inc
+        if activity[variable] > 1e100:
+            for v in range(1, self.num_vars + 1):
+                activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+        if self.heap_index[variable] >= 0:
+            self._heap_up(self.heap_index[variable])
+
+    def _bump_clause(self, clause):
+        clause.activity += self.clause_inc
+        if clause.activity > 1e20:
+            for learnt in self.learnts:
+                learnt.activity *= 1e-20
+            self.clause_inc *= 1e-20
+
+    def _decay(self):
+        self.var_inc /= self.var_decay
+        self.clause_inc /= self.clause_decay
+
+    def _heap_insert(self, variable):
+        self.heap_index[variable] = len(self.heap)
+        self.heap.append(variable)
+        self._heap_up(len(self.heap) - 1)
+
+    def _heap_up(self, i):
+        heap = self.heap
+        heap_index = self.heap_index
+        activity = self.activity
+        variable = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if activity[heap[parent]] >= activity[variable]:
+                break
+            heap[i] = heap[parent]
+            heap_index[heap[i]] = i
+            i = parent
+        heap[i] = variable
+        heap_index[variable] = i
+
+    def _heap_pop(self):
+        heap = self.heap
+        heap_index = self.heap_index
+        activity = self.activity
+        top = heap[0]
+        last = heap.pop()
+        heap_index[top] = -1
+        if heap:
+            i = 0
+            size = len(heap)
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size and activity[heap[child + 1]] > activity[heap[child]]:
+                    child += 1
+                if activity[heap[child]] <= activity[last]:
+                    break
+                heap[i] = heap[child]
+                heap_index[heap[i]] = i
+                i = child
+            heap[i] = last
+            heap_index[last] = i
+        return top
+
+    def _pick_branch_literal(self):
+        value = self.value
+        while self.heap:
+            variable = self._heap_pop()
+            if value[2 * variable] == UNASSIGNED:
+                return 2 * variable + (not self.polarity[variable])
+        return None
+
+    # ---- learned clause deletion ----
+
+    def _locked(self, clause):
+        first = clause.lits[0]
+        return self.reason[first >> 1] is clause and self.value[first] == TRUE
+
+    def _reduce_db(self):
+        """Deletes about half of the learned clauses, keeping the ones with low LBD and high activity."""
+        self.learnts.sort(key=lambda clause: (-clause.lbd, clause.activity))
+        half = len(self.learnts) // 2
+        kept = []
+        for k, clause in enumerate(self.learnts):
+            if k < half and clause.lbd > 2 and len(clause.lits) > 2 and not self._locked(clause):
+                clause.deleted = True
+            else:
+                kept.append(clause)
+        self.learnts = kept
+
+    # ---- search ----
+
+    def _restart_interval(self, restart):
+        if self.restarts == 'luby':
+            return self.restart_base * luby(restart)
+        if self.restarts == 'geometric':
+            return int(self.restart_base * 1.5 ** restart)
+        return float('inf')
+
+    def _search(self, max_conflicts):
+        """Searches for a model until max_conflicts conflicts happen.
+        Returns True (model found), False (unsatisfiable) or None (restart)."""
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    return False
+                learnt, backjump_level, lbd = self._analyze(conflict)
+                self._cancel_until(backjump_level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    clause = Clause(learnt, learnt=True, lbd=lbd)
+                    self._attach(clause)
+                    self._bump_clause(clause)
+                    self._assign(learnt[0], clause)
+                self._decay()
+                continue
+            if conflicts >= max_conflicts:
+                self._cancel_until(0)
+                return None
+            if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                self._reduce_db()
+            code = None
+            while len(self.trail_lim) < len(self.assumptions):  # the assumptions are the first decisions
+                literal = self.assumptions[len(self.trail_lim)]
+                self._ensure_var(abs(literal))
+                assumption = 2 * abs(literal) + (literal < 0)
+                if self.value[assumption] == TRUE:
+                    self.trail_lim.append(len(self.trail))  # dummy decision level
+                elif self.value[assumption] == FALSE:
+                    self.core = self._analyze_final(assumption)
+                    return False
+                else:
+                    code = assumption
+                    break
+            if code is None:
+                code = self._pick_branch_literal()
+                if code is None:
+                    return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self._assign(code, None)
+
+    def _analyze_final(self, code):
+        """Returns the assumptions (as DIMACS literals) responsible for assumption code being false."""
+        core = [_dimacs(code)]
+        seen = self.seen
+        level = self.level
+        seen[code >> 1] = True
+        to_clear = [code >> 1]
+        pending = 1 if level[code >> 1] > 0 else 0  # seen variables above level 0 not reached yet on the trail
+        index = len(self.trail) - 1
+        while pending:
+            q = self.trail[index]
+            index -= 1
+            variable = q >> 1
+            if not seen[variable]:
+                continue
+            pending -= 1
+            clause = self._reason(variable)
+            if clause is None:  # an assumption (which may be the negation of code)
+                core.append(_dimacs(q))
+            else:
+                for r in clause.lits[1:]:
+                    if level[r >> 1] > 0 and not seen[r >> 1]:
+                        seen[r >> 1] = True
+                        to_clear.append(r >> 1)
+                        pending += 1
+        for variable in to_clear:
+            seen[variable] = False
+        return core
+
+    def solve(self, assumptions=()):
+        """Returns True if the clauses are satisfiable, and False otherwise.
+        If they are satisfiable, model is the list of the literals of a model (one literal per variable).
+        assumptions is a sequence of DIMACS literals that must be true in the model. If the clauses are
+        unsatisfiable under the assumptions, core is the list of the assumptions used to show it (an empty list
+        means that the clauses are unsatisfiable without any assumption).
+        The levels of the assumptions stay on the trail after the call, so that a following call whose assumptions
+        start with the same literals (with no clauses added in between) does not propagate them again."""
+        self.model = None
+        self.core = None
+        if not self.ok:
+            self.core = []
+            return False
+        assumptions = list(assumptions)
+        self._cancel_until(_common_prefix(self.assumptions, assumptions, len(self.trail_lim)))
+        self.assumptions = assumptions
+        self.max_learnts = max(len(self.clauses) // 3, 1000)
+        restart = 0
+        while True:
+            result = self._search(self._restart_interval(restart))
+            restart += 1
+            if result is None:
+                self.max_learnts *= 1.05
+                continue
+            if result:
+                self.model = [v if self.value[2 * v] == TRUE else -v for v in range(1, self.num_vars + 1)]
+            elif self.core is None:
+                self.ok = False
+                self.core = []
+            self._cancel_until(min(len(self.assumptions), len(self.trail_lim)))
+            return result
+
+
+def _common_prefix(first, second, limit):
+    """Returns the length of the longest common prefix of two lists, up to limit (by bisection, since comparing
+    slices is much faster than comparing elements one by one)."""
+    limit = min(len(first), len(second), limit)
+    if first[:limit] == second[:limit]:
+        return limit
+    low, high = 0, limit  # first[:low] == second[:low] and first[:high] != second[:high]
+    while high - low > 1:
+        middle = (low + high) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _dimacs(code):
+    return -(code >> 1) if code & 1 else code >> 1
+
+
+def solve_cnf(cnf, **options):
+    """Returns the model (list of literals) of a CNF found by a new Solver, or None if the CNF is unsatisfiable."""
+    solver = Solver(**options)
+    solver._ensure_var(cnf.num_vars)
+    solver.add_clauses(cnf)
+    if solver.solve():
+        return solver.model
+    return None
@@ -0,0 +1,110 @@
+"""The goal in this module is to represent formulas in conjunctive normal form (CNF) as integers,
+in the same way as the DIMACS format used by SAT solvers.
+
+Variables are the integers 1, 2, ..., num_vars, the literal v means that variable v is true and
+the literal -v means that it is false. A clause is a sequence of literals, and all clauses are stored
+in one flat array in which each clause is terminated by 0. For example, the CNF
+
+    (p ∨ ¬q) ∧ (q ∨ r)
+
+is stored as the literals [1, -2, 0, 2, 3, 0], where p, q and r are the variables 1, 2 and 3.
+"""
+
+from array import array
+
+from formula import *
+
+
+class CNF:
+    """A set of clauses over integer variables.
+    Atoms of formulas are mapped to variables by name, and names[v] is the name of variable v
+    (variables that do not come from an atom, such as auxiliary variables, have no name)."""
+
+    def __init__(self, num_vars=0):
+        self.num_vars = num_vars
+        self.num_clauses = 0
+        self.literals = array('i')
+        self.names = {}
+        self.variables = {}
+
+    def __len__(self):
+        return self.num_clauses
+
+    def __iter__(self):
+        """Iterates over the clauses, each one as a tuple of literals."""
+        clause = []
+        for literal in self.literals:
+            if literal:
+                clause.append(literal)
+            else:
+                yield tuple(clause)
+                clause = []
+
+    def new_var(self, name=None):
+        """Creates a new variable and returns it. If a name is given, the variable represents Atom(name)."""
+        self.num_vars += 1
+        if name is not None:
+            self.names[self.num_vars] = name
+            self.variables[name] = self.num_vars
+        return self.num_vars
+
+    def variable(self, name):
+        """Returns the variable that represents Atom(name), creating it if needed."""
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.new_var(name)
+        return variable
+
+    def add_clause(self, clause):
+        """Adds a clause given as a sequence of nonzero literals."""
+        for literal in clause:
+            if abs(literal) > self.num_vars:
+                self.num_vars = abs(literal)
+            self.literals.append(literal)
+        self.literals.append(0)
+        self.num_clauses += 1
+
+    def add_clauses(self, clauses):
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def literal(self, formula):
+        """Returns the integer literal of a formula that is an atom or the negation of an atom."""
+        if isinstance(formula, Atom):
+            return self.variable(formula.name)
+        if isinstance(formula, Not) and isinstance(formula.inner, Atom):
+            return -self.variable(formula.inner.name)
+        raise ValueError(str(formula) + ' is not a literal')
+
+    def add_formula(self, formula):
+        """Adds the clauses of a formula that is already in clausal form:
+        a conjunction (possibly nested) whose conjuncts are literals, disjunctions of literals or
+        negations of conjunctions of literals, such as (¬(p ∧ q)), which is the clause (¬p ∨ ¬q).
+        Raises ValueError for other formulas."""
+
+        stack = [formula]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, And):
+                stack.extend(reversed(current.args))
+            else:
+                self.add_clause(self._clause(current))
+
+    def _clause(self, formula):
+        if isinstance(formula, Not) and isinstance(formula.inner, And):
+            return [-self.literal(arg) for arg in formula.inner.args]
+        clause = []
+        stack = [formula]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, Or):
+                stack.extend(reversed(current.args))
+            else:
+                clause.append(self.literal(current))
+        return clause
+
+    def interpretation(self, model):
+        """Converts a model, a collection of true literals, into an interpretation such as {'p': True, 'q': False}.
+        Only named variables appear in the interpretation; the ones missing from the model are false."""
+        true_variables = {literal for literal in model if literal > 0}
+        return {name: variable in true_variables for name, variable in self.variables.items()}
@@ -0,0 +1,180 @@
+"""The goal in this module is to decide the satisfiability of sets of clauses on several CPU cores,
+with the cube-and-conquer method.
+
+First, a lookahead splitter divides the problem into cubes: partial assignments (lists of literals) such that
+every model of the clauses extends exactly one cube. At each split, the splitter tries a few candidate variables
+x, propagates x and ¬x, and splits on the variable that makes both sides simplest (the product of the numbers of
+literals implied on each side is largest); a literal whose propagation fails is fixed instead.
+Then, each cube is solved by one of a pool of worker processes, each with its own incremental CDCL solver
+(see cdcl.py) that receives the cube as assumptions. The first worker that finds a model stops all the others
+(they are killed, see Worker), and the clauses are unsatisfiable only if every cube is.
+"""
+
+from math import ceil, log2
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+import os
+
+from cdcl import Solver
+
+# number of cubes per worker process, so that workers that finish early can take other cubes.
+CUBES_PER_WORKER = 4
+
+# number of variables (the ones that occur most often) tried by the lookahead at each split.
+LOOKAHEAD_CANDIDATES = 8
+
+
+def split_cubes(solver, depth, candidates=LOOKAHEAD_CANDIDATES):
+    """Returns a list of cubes, with at most depth decisions each, that together cover all models of the clauses
+    of solver. Cubes that propagation already refutes are left out, so an empty list means that the clauses are
+    unsatisfiable."""
+
+    occurrences = [0] * (solver.num_vars + 1)
+    for clause in solver.clauses:
+        for code in clause.lits:
+            occurrences[code >> 1] += 1
+    by_occurrences = sorted(range(1, solver.num_vars + 1), key=lambda variable: -occurrences[variable])
+
+    cubes = []
+    stack = [([], 0)]  # cube and number of decisions in it
+    while stack:
+        cube, decisions = stack.pop()
+        implied = solver.implied(cube)
+        if implied is None:
+            continue
+        assigned = {abs(literal) for literal in implied}
+        free = [variable for variable in by_occurrences if variable not in assigned]
+        if decisions >= depth or not free:
+            cubes.append(cube)
+            continue
+        best, best_score = None, -1
+        for variable in free[:candidates]:
+            positive = solver.implied(cube + [variable])
+            negative = solver.implied(cube + [-variable])
+            if positive is None or negative is None:  # a failed literal: the other one is forced
+                best = None
+                if positive is not None:
+                    stack.append((cube + [variable], decisions))
+                elif negative is not None:
+                    stack.append((cube + [-variable], decisions))
+                break
+            score = (len(positive) - len(implied)) * (len(negative) - len(implied))
+            if score > best_score:
+                best, best_score = variable, score
+        else:
+            stack.append((cube + [-best], decisions + 1))
+            stack.append((cube + [best], decisions + 1))
+    return cubes
+
+
+class Worker:
+    """A worker process that, for each task (a tuple of arguments) it receives, sends back function(*task).
+    It starts by calling initializer(*initargs), if given. Each worker talks to this process through a pipe of
+    its own, so it can be killed at any moment, even in the middle of a task, without disturbing the others."""
+
+    def __init__(self, function, initializer=None, initargs=()):
+        self.connection, child = Pipe()
+        self.process = Process(target=_serve, args=(child, function, initializer, initargs), daemon=True)
+        self.process.start()
+        child.close()
+
+    def submit(self, task):
+        self.connection.send(task)
+
+    def result(self):
+        """Returns the result of the last task, waiting for it, or raises the exception the task raised."""
+        succeeded, value = self.connection.recv()
+        if not succeeded:
+            raise value
+        return value
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def _serve(connection, function, initializer, initargs):
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:  # this process was closed
+            return
+        try:
+            connection.send((True, function(*task)))
+        except Exception as error:
+            connection.send((False, error))
+
+
+def ready(workers):
+    """Waits until some of the workers have a result, and returns them."""
+    connections = wait([worker.connection for worker in workers])
+    return [worker for worker in workers if worker.connection in connections]
+
+
+def terminate(workers):
+    """Kills the workers, whether or not they are running a task."""
+    for worker in workers:
+        worker.kill()
+
+
+_worker_solver = None
+
+
+def _start_worker(clauses, num_vars, options):
+    global _worker_solver
+    _worker_solver = Solver(**options)
+    _worker_solver._ensure_var(num_vars)
+    _worker_solver.add_clauses(clauses)
+
+
+def _solve_cube(cube):
+    if _worker_solver.solve(cube):
+        return _worker_solver.model
+    return None
+
+
+def solve_cubes(clauses, num_vars=0, workers=None, **options):
+    """Returns a model (list of literals) of the clauses, or None if they are unsatisfiable, solving the cubes of
+    the lookahead splitter in parallel in workers processes (by default, one per CPU core).
+    options are passed to the Solver of each worker."""
+
+    clauses = [list(clause) for clause in clauses]
+    workers = workers or os.cpu_count() or 1
+    solver = Solver(**options)
+    solver._ensure_var(num_vars)
+    if not solver.add_clauses(clauses):
+        return None
+    cubes = split_cubes(solver, ceil(log2(workers * CUBES_PER_WORKER)))
+    if not cubes:
+        return None
+
+    pool = [Worker(_solve_cube, _start_worker, (clauses, solver.num_vars, options))
+            for _ in range(min(workers, len(cubes)))]
+    try:
+        remaining = iter(cubes)
+        busy = []
+        for worker, cube in zip(pool, remaining):
+            worker.submit((cube,))
+            busy.append(worker)
+        while busy:  # each worker takes another cube when it finishes one, until a model is found
+            for worker in ready(busy):
+                model = worker.result()
+                if model is not None:
+                    return model
+                cube = next(remaining, None)
+                if cube is None:
+                    busy.remove(worker)
+                else:
+                    worker.submit((cube,))
+        return None
+    finally:
+        terminate(pool)
+
+
+def solve_cnf_parallel(cnf, workers=None, **options):
+    """Returns a model (list of literals) of a CNF (see cnf.py), or None if it is unsatisfiable,
+    with cube-and-conquer on workers processes."""
+    return solve_cubes(cnf, cnf.num_vars, workers, **options)
@@ -0,0 +1,104 @@
+"""The goal in this module is to read and write formulas in the DIMACS CNF format,
+the standard input format of SAT solvers and SAT benchmarks. For example, the file
+
+    c (p ∨ ¬q) ∧ (q ∨ r)
+    p cnf 3 2
+    1 -2 0
+    2 3 0
+
+describes two clauses over three variables. Files are processed line by line, so large
+benchmarks are streamed straight into a CNF (see cnf.py) without building formulas.
+Files whose names end with .gz, .bz2, .xz or .lzma are decompressed on the fly.
+
+Names of atoms are written as comment lines of the form "c var 1 p", which are read back by read_dimacs.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+from array import array
+
+from cnf import CNF
+
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open}
+
+
+def open_dimacs(path, mode='rt'):
+    """Opens a DIMACS file for reading ('rt') or writing ('wt'), compressed according to its extension."""
+    for extension, opener in OPENERS.items():
+        if str(path).endswith(extension):
+            return opener(path, mode)
+    return open(path, mode)
+
+
+def read_dimacs(source, cnf=None):
+    """Reads a DIMACS file, given by its path or as an open text file, into a CNF and returns the CNF.
+    The clauses are appended to cnf if it is given."""
+
+    if cnf is None:
+        cnf = CNF()
+    if isinstance(source, (str, os.PathLike)):
+        with open_dimacs(source) as file:
+            return _read(file, cnf)
+    return _read(source, cnf)
+
+
+def _read(file, cnf):
+    literals = cnf.literals
+    num_vars = cnf.num_vars
+    for line in file:
+        if not line or line[0] == '\n':
+            continue
+        if line[0] == 'c':
+            fields = line.split(None, 3)
+            if len(fields) == 4 and fields[1] == 'var':
+                variable, name = int(fields[2]), fields[3].rstrip('\n')
+                cnf.names[variable] = name
+                cnf.variables[name] = variable
+            continue
+        if line[0] == 'p':
+            fields = line.split()
+            if len(fields) != 4 or fields[1] != 'cnf':
+                raise ValueError('invalid DIMACS problem line: ' + line.strip())
+            num_vars = max(num_vars, int(fields[2]))
+            continue
+        if line[0] == '%':
+            break
+        clause = array('i', map(int, line.split()))
+        literals.extend(clause)
+        cnf.num_clauses += clause.count(0)
+    if literals and literals[-1] != 0:
+        literals.append(0)
+        cnf.num_clauses += 1
+    if literals:
+        num_vars = max(num_vars, max(literals), -min(literals))
+    cnf.num_vars = num_vars
+    return cnf
+
+
+def write_dimacs(cnf, destination, comments=()):
+    """Writes a CNF in the DIMACS format to a path or to an open text file.
+    comments is an optional sequence of lines written at the top of the file."""
+
+    if isinstance(destination, (str, os.PathLike)):
+        with open_dimacs(destination, 'wt') as file:
+            _write(cnf, file, comments)
+    else:
+        _write(cnf, destination, comments)
+
+
+def _write(cnf, file, comments):
+    for comment in comments:
+        file.write('c ' + comment + '\n')
+    for variable in sorted(cnf.names):
+        file.write('c var ' + str(variable) + ' ' + str(cnf.names[variable]) + '\n')
+    file.write('p cnf ' + str(cnf.num_vars) + ' ' + str(cnf.num_clauses) + '\n')
+    literals = cnf.literals
+    start = 0
+    while start < len(literals):  # writes about 64k literals at a time, always ending at a clause end
+        end = min(start + 65536, len(literals))
+        while literals[end - 1] != 0:
+            end += 1
+        file.write(''.join(str(literal) + (' ' if literal else '\n') for literal in literals[start:end]))
+        start = end
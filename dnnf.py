@@ -0,0 +1,277 @@
+"""The goal in this module is to compile a formula into deterministic decomposable negation normal form (d-DNNF),
+once, so that many queries about it can then be answered in time linear in the size of the result.
+
+A formula in negation normal form is decomposable if the conjuncts of each conjunction share no atoms
+(see is_decomposable_negation_normal_form in functions.py) and deterministic if the disjuncts of each
+disjunction have no model in common. The compiler follows the search of the model counter (see model_counting.py)
+and records it: a decision on variable x with results A and B becomes the disjunction ((x ∧ A) ∨ (¬x ∧ B)),
+which is deterministic, and independent components become a conjunction, which is decomposable.
+Components found again are compiled once, so the result is a DAG of shared subformulas (formulas are hash-consed).
+For example,
+
+    compiled = compile_dnnf(Or(Atom('p'), Atom('q')))
+    print(compiled.root)                          # (p ∨ ((¬p) ∧ q))
+    compiled.count()                              # 3
+    compiled.entails(Or(Atom('p'), Atom('q')))    # True
+    compiled.condition({'p': False}).count()      # 1, the model in which q is true
+"""
+
+from formula import *
+from functions import postorder
+from model_counting import Residual, normalize
+from tseitin import tseitin
+
+
+class DNNF:
+    """A formula in d-DNNF over a list of atoms (names). root is the formula, or the constant True or False.
+    The queries below only rely on decomposability and determinism, and each one traverses every distinct
+    subformula of root once."""
+
+    def __init__(self, root, atoms):
+        self.root = root
+        self.atoms = list(atoms)
+
+    def count(self):
+        """Returns the number of interpretations of the atoms that satisfy the formula."""
+        if self.root is True or self.root is False:
+            return (1 << len(self.atoms)) if self.root else 0
+        counts = {}
+        masks = {}  # atoms of each subformula, as a bit mask of their positions in the list of atoms
+        position = {name: k for k, name in enumerate(self.atoms)}
+        for current in postorder(self.root):
+            if isinstance(current, Atom):
+                counts[current] = 1
+                masks[current] = 1 << position[current.name]
+            elif isinstance(current, Not):
+                counts[current] = 1
+                masks[current] = masks[current.inner]
+            else:
+                mask = 0
+                for arg in current.args:
+                    mask |= masks[arg]
+                masks[current] = mask
+                if isinstance(current, And):
+                    count = 1
+                    for arg in current.args:
+                        count *= counts[arg]
+                else:  # the disjuncts are smoothed: atoms missing from a disjunct can take any value
+                    size = bin(mask).count('1')
+                    count = sum(counts[arg] << (size - bin(masks[arg]).count('1')) for arg in current.args)
+                counts[current] = count
+        return counts[self.root] << (len(self.atoms) - bin(masks[self.root]).count('1'))
+
+    def _values(self, interpretation):
+        """Returns the truth value (True, False or None, if it depends on other atoms) of each subformula
+        after replacing the atoms of the partial interpretation by their values."""
+        values = {}
+        for current in postorder(self.root):
+            if isinstance(current, Atom):
+                values[current] = interpretation.get(current.name)
+            elif isinstance(current, Not):
+                value = values[current.inner]
+                values[current] = None if value is None else not value
+            else:
+                args = [values[arg] for arg in current.args]
+                absorbing = isinstance(current, Or)  # the value that decides an And (False) or an Or (True)
+                if absorbing in args:
+                    values[current] = absorbing
+                elif None in args:
+                    values[current] = None
+                else:
+                    values[current] = not absorbing
+        return values
+
+    def is_satisfiable(self, interpretation=None):
+        """Returns True if some model of the formula extends the partial interpretation (by default, empty)."""
+        if self.root is True or self.root is False:
+            return self.root
+        values = self._values(interpretation or {})
+        # in a decomposable formula, a conjunction of satisfiable formulas is satisfiable.
+        satisfiable = {}
+        for current in postorder(self.root):
+            if values[current] is not None:
+                satisfiable[current] = values[current]
+            elif isinstance(current, (Atom, Not)):
+                satisfiable[current] = True
+            elif isinstance(current, And):
+                satisfiable[current] = all(satisfiable[arg] for arg in current.args)
+            else:
+                satisfiable[current] = any(satisfiable[arg] for arg in current.args)
+        return satisfiable[self.root]
+
+    def condition(self, interpretation):
+        """Returns the d-DNNF obtained by replacing the atoms of the partial interpretation by their values.
+        Its atoms are the atoms that are not in the interpretation."""
+        atoms = [name for name in self.atoms if name not in interpretation]
+        if self.root is True or self.root is False:
+            return DNNF(self.root, atoms)
+        values = self._values(interpretation)
+        conditioned = {}
+        for current in postorder(self.root):
+            if values[current] is not None:
+                conditioned[current] = values[current]
+            elif isinstance(current, (Atom, Not)):
+                conditioned[current] = current
+            else:
+                conditioned[current] = _join(type(current), [conditioned[arg] for arg in current.args])
+        return DNNF(conditioned[self.root], atoms)
+
+    def entails(self, clause):
+        """Returns True if the clause (a literal or a disjunction of literals) is true in every model of the
+        formula, that is, if no model makes all its literals false."""
+        literals = clause.args if isinstance(clause, Or) else (clause,)
+        falsifying = {}
+        for literal in literals:
+            if isinstance(literal, Atom):
+                name, value = literal.name, False
+            elif isinstance(literal, Not) and isinstance(literal.inner, Atom):
+                name, value = literal.inner.name, True
+            else:
+                raise ValueError(str(clause) + ' is not a clause')
+            if falsifying.get(name, value) != value:
+                return True  # the clause has complementary literals
+            falsifying[name] = value
+        return not self.is_satisfiable(falsifying)
+
+    def min_cardinality(self):
+        """Returns a pair (k, model): the least number k of atoms that are true in a model of the formula,
+        and a model (dictionary) with exactly k true atoms; or (None, None) if the formula is unsatisfiable."""
+        if self.root is False:
+            return None, None
+        model = {name: False for name in self.atoms}
+        if self.root is True:
+            return 0, model
+        costs = {}
+        for current in postorder(self.root):
+            if isinstance(current, Atom):
+                costs[current] = 1
+            elif isinstance(current, Not):
+                costs[current] = 0
+            elif isinstance(current, And):
+                costs[current] = sum(costs[arg] for arg in current.args)
+            else:  # atoms missing from a disjunct are made false, so they cost nothing
+                costs[current] = min(costs[arg] for arg in current.args)
+        # the model follows the cheapest disjunct of each disjunction, from the root.
+        stack = [self.root]
+        visited = set()
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            if isinstance(current, Atom):
+                model[current.name] = True
+            elif isinstance(current, And):
+                stack.extend(current.args)
+            elif isinstance(current, Or):
+                stack.append(min(current.args, key=costs.get))
+        return costs[self.root], model
+
+
+def _join(cls, args):
+    """Returns the conjunction (cls is And) or disjunction (cls is Or) of args, which may contain True and False."""
+    absorbing = cls is Or
+    if absorbing in args:
+        return absorbing
+    args = [arg for arg in args if arg is not (not absorbing)]
+    if not args:
+        return not absorbing
+    return and_all(args) if cls is And else or_all(args)
+
+
+class DNNFCompiler:
+    """Compiles sets of clauses of DIMACS literals (see cnf.py) into d-DNNF formulas.
+    names maps the variables to the names of their atoms. The variables that are not in names are forgotten
+    (existentially quantified). This keeps the result deterministic only if they are determined by the other
+    variables, as the auxiliary variables of the full Tseitin transformation are."""
+
+    def __init__(self, names):
+        self.names = names
+        self.cache = {}  # component -> compiled formula (or True or False)
+        self.clause_ids = {}  # clause -> its number in the keys of the cache, as in ModelCounter
+
+    def _literal(self, literal):
+        name = self.names.get(abs(literal))
+        if name is None:
+            return True
+        return Atom(name) if literal > 0 else Not(Atom(name))
+
+    def compile(self, clauses):
+        """Returns the d-DNNF formula (or True or False) equivalent to the clauses, with the variables
+        that are not named forgotten."""
+        clauses, units = normalize(clauses)
+        if clauses is None:
+            return False
+        num_vars = max([abs(literal) for clause in clauses for literal in clause] +
+                       [abs(literal) for literal in units], default=0)
+        residual = Residual(clauses, num_vars)
+        ids = [self.clause_ids.setdefault(clause, len(self.clause_ids)) for clause in clauses]
+        for literal in units:
+            if not residual.assign(literal):
+                return False
+        parts = [self._literal(literal) for literal in sorted(residual.trail, key=abs)]
+        # named variables are preferred, so that forgotten variables are decided as little as possible.
+        _, components = residual.components(range(1, num_vars + 1), self.names)
+
+        # the search runs on an explicit stack of generators, as in ModelCounter.
+        for component in components:
+            stack = [self._compile(residual, ids, *component)]
+            value = None
+            while stack:
+                try:
+                    request = stack[-1].send(value)
+                except StopIteration as stop:
+                    stack.pop()
+                    value = stop.value
+                    continue
+                stack.append(self._compile(residual, ids, *request))
+                value = None
+            if value is False:
+                return False
+            parts.append(value)
+        return _join(And, parts)
+
+    def _compile(self, residual, ids, variables, clauses, variable):
+        """Generator that compiles a component (see ModelCounter._count), deciding variable first."""
+        key = (variables, tuple(sorted(ids[index] for index in clauses)))
+        compiled = self.cache.get(key)
+        if compiled is not None:
+            return compiled
+        branches = []
+        for literal in (variable, -variable):
+            mark = len(residual.trail)
+            branch = False
+            if residual.assign(literal):
+                # the decision and the literals it implies, starting with the decision literal.
+                parts = [self._literal(implied) for implied in residual.trail[mark:]]
+                _, components = residual.components(variables, self.names)
+                for component in components:
+                    part = yield component
+                    if part is False:
+                        break
+                    parts.append(part)
+                else:
+                    branch = _join(And, parts)
+            residual.undo(mark)
+            branches.append(branch)
+        compiled = _join(Or, branches)
+        self.cache[key] = compiled
+        return compiled
+
+
+def compile_cnf(cnf):
+    """Returns the d-DNNF of a CNF (see cnf.py) over all its variables. Variables without a name in cnf.names
+    are named by their number in parentheses, such as '(var 3)', which no atom read by formula_parser.py has
+    (as the auxiliary atoms of cardinality.py), so they cannot be confused with the named ones."""
+    names = {variable: cnf.names.get(variable, '(var ' + str(variable) + ')')
+             for variable in range(1, cnf.num_vars + 1)}
+    root = DNNFCompiler(names).compile(cnf)
+    return DNNF(root, [names[variable] for variable in range(1, cnf.num_vars + 1)])
+
+
+def compile_dnnf(formula):
+    """Returns the d-DNNF of formula over its atoms (sorted). The formula is first transformed into clauses with
+    the full Tseitin transformation (see tseitin.py), whose auxiliary variables are then forgotten."""
+    cnf = tseitin(formula, polarity=False)
+    root = DNNFCompiler(cnf.names).compile(cnf)
+    return DNNF(root, sorted(cnf.variables))
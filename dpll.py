@@ -0,0 +1,128 @@
+"""The goal in this module is to decide the satisfiability of sets of clauses (see cnf.py) with the DPLL procedure.
+
+The search assigns variables one at a time and, after each decision:
+    - propagates unit clauses, found through the lists of the clauses in which each literal occurs;
+    - assigns the pure literals, whose negation occurs in no clause that is not satisfied yet;
+    - optionally, evaluates the original formula in the partial assignment (see PartialEvaluator in semantics.py),
+      which can show a conflict, or that the formula is already true, before the clauses do.
+Assignments are recorded on a trail and undone when the search backtracks, instead of copying the assignment
+at each node of the search tree.
+"""
+
+
+def dpll(clauses, num_vars=0, evaluator=None, names=None):
+    """Returns a model (list of literals) of the clauses, or False if they are unsatisfiable.
+    If evaluator is a PartialEvaluator of a formula whose atoms are the variables in names (variable -> atom name),
+    such that the models of the clauses are the models of the formula, it is used to cut the search early;
+    the search then stops as soon as the formula is true, and only the named variables of the model are meaningful."""
+
+    clauses = [sorted(set(clause)) for clause in clauses]
+    num_vars = max([num_vars] + [abs(literal) for clause in clauses for literal in clause])
+    if any(not clause for clause in clauses):
+        return False
+    names = names or {}
+    occurrences = {}  # literal -> indexes of the clauses in which it occurs
+    for index, clause in enumerate(clauses):
+        for literal in clause:
+            occurrences.setdefault(literal, []).append(index)
+    value = [None] * (num_vars + 1)
+    true_literals = [0] * len(clauses)  # number of true literals of each clause
+    false_literals = [0] * len(clauses)
+    active = {literal: len(indexes) for literal, indexes in occurrences.items()}  # occurrences in unsatisfied clauses
+    satisfied = [0]  # number of satisfied clauses
+    trail = []
+
+    def assign(literal):
+        """Makes literal true. Returns the unit clauses it creates, or None if it makes a clause false."""
+        variable = abs(literal)
+        value[variable] = literal > 0
+        trail.append(literal)
+        if evaluator is not None and variable in names:
+            evaluator.assign(names[variable], literal > 0)
+        for index in occurrences.get(literal, ()):
+            true_literals[index] += 1
+            if true_literals[index] == 1:
+                satisfied[0] += 1
+                for other in clauses[index]:
+                    active[other] -= 1
+        units = []
+        conflict = False
+        for index in occurrences.get(-literal, ()):
+            false_literals[index] += 1
+            if true_literals[index]:
+                continue
+            unassigned = len(clauses[index]) - false_literals[index]
+            if unassigned == 0:
+                conflict = True
+            elif unassigned == 1:
+                units.append(index)
+        return None if conflict else units
+
+    def undo(size):
+        """Undoes the assignments of the trail after its first size elements."""
+        while len(trail) > size:
+            literal = trail.pop()
+            variable = abs(literal)
+            value[variable] = None
+            if evaluator is not None and variable in names:
+                evaluator.assign(names[variable], None)
+            for index in occurrences.get(literal, ()):
+                true_literals[index] -= 1
+                if true_literals[index] == 0:
+                    satisfied[0] -= 1
+                    for other in clauses[index]:
+                        active[other] += 1
+            for index in occurrences.get(-literal, ()):
+                false_literals[index] -= 1
+
+    def propagate(literal):
+        """Assigns literal and propagates the unit clauses. Returns False on a conflict."""
+        queue = [literal]
+        while queue:
+            literal = queue.pop()
+            if value[abs(literal)] is not None:
+                if value[abs(literal)] != (literal > 0):
+                    return False
+                continue
+            units = assign(literal)
+            if units is None:
+                return False
+            for index in units:
+                if true_literals[index]:
+                    continue
+                for other in clauses[index]:
+                    if value[abs(other)] is None:
+                        queue.append(other)
+                        break
+        return evaluator is None or evaluator.value is not False
+
+    def model():
+        return [variable if value[variable] else -variable for variable in range(1, num_vars + 1)]
+
+    decisions = []  # (size of the trail before the decision, literal, whether its negation was tried)
+    ok = all(propagate(clause[0]) for clause in clauses if len(clause) == 1)
+    while True:
+        if ok:
+            if satisfied[0] == len(clauses) or (evaluator is not None and evaluator.value is True):
+                return model()
+            for variable in range(1, num_vars + 1):  # pure literals
+                if value[variable] is None:
+                    if active.get(variable, 0) and not active.get(-variable, 0):
+                        propagate(variable)
+                    elif active.get(-variable, 0) and not active.get(variable, 0):
+                        propagate(-variable)
+            if satisfied[0] == len(clauses) or (evaluator is not None and evaluator.value is True):
+                return model()
+            # branches on the literal that occurs in the most unsatisfied clauses.
+            literal = max((literal for literal in active if value[abs(literal)] is None), key=active.get)
+            decisions.append((len(trail), literal, False))
+            ok = propagate(literal)
+            continue
+        while decisions and decisions[-1][2]:
+            decisions.pop()
+        if not decisions:
+            return False
+        size, literal, _ = decisions.pop()
+        undo(size)
+        decisions.append((size, -literal, True))
+        ok = propagate(-literal)
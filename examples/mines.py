@@ -1,4 +1,5 @@
 from semantics import *
+from knowledge_base import KnowledgeBase
 from typing import List
 from typing import Union
 
@@ -62,54 +63,26 @@ def no_mines(grid):
     return premises
 
 
-# if a square (i, j) has number k, there is exactly k mines adjacent to (i, j):
+# if a square (i, j) has number k, there is exactly k mines adjacent to (i, j).
+# each constraint is a pair (atoms of the adjacent squares, k), which the knowledge base gives to the solver
+# as it is (see add_exactly in knowledge_base.py), without clauses for every combination of adjacent squares:
 
 def mines_neighborhood(grid):
-    premises = []
+    constraints = []
     for i in range(len(grid)):
         for j in range(len(grid[i])):
-            if grid[i][j] == 1:
-                premises = premises + at_least_one(i, j)
-                premises = premises + at_most_one(i, j)
-            if grid[i][j] == 2:
-                pass
-                # ======== YOUR CODE HERE ========
-            if grid[i][j] == 3:
-                pass
-                # ======== YOUR CODE HERE ========
-
-    return premises
-
-
-# at most one mine is adjacent to (i, j):
-
-def at_most_one(i, j):
-    neighbors = get_adjacent_cells(i, j)
-    neighbors.remove((i, j))
-    neighbors.sort()
-    formulas = []
-    for neighbor1 in neighbors:
-        for neighbor2 in neighbors:
-            if neighbor1 < neighbor2:
-                formulas = formulas + [Not(And(Atom(str(neighbor1[0]) + '_' + str(neighbor1[1])),
-                                               Atom(str(neighbor2[0]) + '_' + str(neighbor2[1]))))]
-    return formulas
+            if grid[i][j] != -1:
+                constraints.append((neighbor_atoms(i, j), grid[i][j]))
+    return constraints
 
 
-# at least one mine is adjacent to (i, j):
+# the atoms of the squares adjacent to (i, j):
 
-def at_least_one(i, j):  # -> List[Formula]
+def neighbor_atoms(i, j):
     neighbors = get_adjacent_cells(i, j)
     neighbors.remove((i, j))
     neighbors.sort()
-    atoms = []
-    for neighbor in neighbors:
-        atoms.append(Atom(str(neighbor[0]) + '_' + str(neighbor[1])))
-    final_formula = atoms[0]
-    for atom in atoms:
-        if atom != atoms[0]:
-            final_formula = Or(atom, final_formula)
-    return [final_formula]
+    return [Atom(str(neighbor[0]) + '_' + str(neighbor[1])) for neighbor in neighbors]
 
 
 def get_adjacent_cells(i, j):
@@ -122,17 +95,24 @@ print('premises in no_mines(my_grid): ')
 for premise in no_mines(my_grid):
     print(premise)
 
-print('premises in mines_neighborhood(my_grid) ')
-for premise in mines_neighborhood(my_grid):
-    print(premise)
-
-
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Atom('1_2')))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Not(Atom('1_2'))))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Atom('1_3')))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Not(Atom('1_3'))))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Atom('2_0')))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Not(Atom('2_0'))))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Atom('3_0')))
-print(is_logical_consequence(no_mines(my_grid) + mines_neighborhood(my_grid), Not(Atom('3_0'))))
-# ======== YOUR CODE HERE ========
+print('constraints in mines_neighborhood(my_grid) ')
+for atoms, k in mines_neighborhood(my_grid):
+    print('exactly', k, 'of', ', '.join(str(atom) for atom in atoms))
+
+
+# the literals true in every model of the premises: Atom('i_j') if (i, j) surely has a mine,
+# and Not(Atom('i_j')) if it surely has none.
+kb = KnowledgeBase(no_mines(my_grid))
+for atoms, k in mines_neighborhood(my_grid):
+    kb.add_exactly(atoms, k)
+forced = kb.backbone()
+print('squares that surely have a mine:')
+for literal in forced:
+    if isinstance(literal, Atom):
+        print(literal)
+print('unrevealed squares that surely have no mine:')
+for literal in forced:
+    if isinstance(literal, Not):
+        i, j = map(int, literal.inner.name.split('_'))
+        if my_grid[i][j] == -1:
+            print(literal.inner)
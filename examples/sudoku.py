@@ -1,4 +1,5 @@
 from semantics import *
+from cardinality import at_most_k
 import time
 from math import sqrt
 
@@ -17,6 +18,16 @@ grid_test2 = [[0, 4, 3, 2],
               [2, 3, 0, 1],
               [4, 1, 2, 0]]
 
+grid_test3 = [[5, 3, 0, 0, 7, 0, 0, 0, 0],
+              [6, 0, 0, 1, 9, 5, 0, 0, 0],
+              [0, 9, 8, 0, 0, 0, 0, 6, 0],
+              [8, 0, 0, 0, 6, 0, 0, 0, 3],
+              [4, 0, 0, 8, 0, 3, 0, 0, 1],
+              [7, 0, 0, 0, 2, 0, 0, 0, 6],
+              [0, 6, 0, 0, 0, 0, 2, 8, 0],
+              [0, 0, 0, 4, 1, 9, 0, 0, 5],
+              [0, 0, 0, 0, 8, 0, 0, 7, 9]]
+
 '''
 grid_test1_ solution = [[2, 1, 4, 3],
                         [4, 3, 2, 1],
@@ -29,36 +40,7 @@ grid_test1_ solution = [[2, 1, 4, 3],
 # atom 2_3_4 denotes that cell (2,3) is filled with 4
 
 
-# auxiliary functions:
-
-def and_all(list_formulas):
-    """
-    Returns a BIG AND formula from a list of formulas
-    For example, if list_formulas is [Atom('1'), Atom('p'), Atom('r')], it returns
-    And(And(Atom('1'), Atom('p')), Atom('r')).
-    :param list_formulas: a list of formulas
-    :return: And formula
-    """
-    first_formula = list_formulas[0]
-    del list_formulas[0]
-    for formula in list_formulas:
-        first_formula = And(first_formula, formula)
-    return first_formula
-
-
-def or_all(list_formulas):
-    """
-    Returns a BIG OR of formulas from a list of formulas.
-    For example, if list_formulas is [Atom('1'), Atom('p'), Atom('r')], it returns
-    Or(Or(Atom('1'), Atom('p')), Atom('r')).
-    :param list_formulas: a list of formulas
-    :return: Or formula
-    """
-    first_formula = list_formulas[0]
-    del list_formulas[0]
-    for formula in list_formulas:
-        first_formula = Or(first_formula, formula)
-    return first_formula
+# and_all and or_all (see formula.py) build single n-ary formulas, merging nested conjunctions and disjunctions.
 
 
 # the solution must agree with the given digits:
@@ -108,18 +90,17 @@ def rows_constraints(grid):
 def cells_constraints(grid):
     """
     Returns a formula requiring that each cell cannot be filled with more than one number.
-    For example, the final formula is of the form ... ∧ ¬(Atom('2_3_1') ∧ Atom('2_2_4')) ∧ ...,
-    which represents that cell 2,3 cannot be filled with 1 and 4.
+    Instead of the formulas ¬(Atom('2_3_1') ∧ Atom('2_3_4')) for each pair of numbers of cell 2,3,
+    whose number grows quadratically with the size of the grid, it uses the linear encodings of
+    "at most one" of cardinality.py (with a few auxiliary atoms, such as '(card 1)'; see is_auxiliary).
     :param grid: sudoku grid
     :return: And formula
     """
     formulas_cells = []
     for i in range(len(grid)):
         for j in range(len(grid)):
-            for n1 in range(len(grid) - 1):
-                for n2 in range(n1 + 1, len(grid)):
-                    formulas_cells.append(Not(And(Atom(str(i + 1) + '_' + str(j + 1) + '_' + str(n1 + 1)),
-                                                  Atom(str(i + 1) + '_' + str(j + 1) + '_' + str(n2 + 1)))))
+            cell = [Atom(str(i + 1) + '_' + str(j + 1) + '_' + str(n + 1)) for n in range(len(grid))]
+            formulas_cells.extend(at_most_k(cell, 1))
     return and_all(formulas_cells)
 
 
@@ -176,20 +157,14 @@ def sudoku_solution(grid):
     that satisfies the formula.
     :param grid: sudoku grid
     """
-    final_formula = And(
-        And(
-            And(
-                given_digits_constraints(grid),
-                rows_constraints(grid)
-            ),
-            And(
-                cells_constraints(grid),
-                columns_constraints(grid)
-            ),
-        ),
+    final_formula = and_all([
+        given_digits_constraints(grid),
+        rows_constraints(grid),
+        cells_constraints(grid),
+        columns_constraints(grid),
         subgrids_constrains(grid)
-    )
-    solution = satisfiability_brute_force(final_formula)
+    ])
+    solution = satisfiability(final_formula)
     if solution:
         for i in range(len(grid)):
             for j in range(len(grid)):
@@ -203,8 +178,9 @@ def sudoku_solution(grid):
         print('Sudoku sem solução!')
 
 
-start_time = time.time()
-print('Solução do sudoku:')
-sudoku_solution(grid_test1)
-end_time = time.time()
-print('Time:', end_time - start_time)
+for grid in [grid_test1, grid_test3]:
+    start_time = time.time()
+    print('Solução do sudoku:')
+    sudoku_solution(grid)
+    end_time = time.time()
+    print('Time:', end_time - start_time)
@@ -7,98 +7,193 @@ formula1 = Or(Atom('p'), Atom('s'))
 As another example, the piece of code below creates an object that represents (p → (p v s)).
 
 formula2 = Implies(Atom('p'), Or(Atom('p'), Atom('s')))
-"""
-
-
-class Formula:
-    def __init__(self):
-        pass
 
+Formulas are immutable and hash-consed: building a formula that is structurally equal to one that
+already exists returns the very same object. Hence Atom('p') is Atom('p'), the hash of a formula is
+computed only once, when it is built, and two formulas are equal if and only if they are the same object.
 
-class Atom(Formula):
-    """
-    This class represents propositional logic variables.
-    """
+And and Or are n-ary: And(Atom('p'), Atom('q'), Atom('r')) represents (p ∧ q ∧ r). Big conjunctions and
+disjunctions should be built this way (see and_all and or_all) instead of as deeply nested binary formulas.
+Every formula has a tuple args with its immediate subformulas.
+"""
 
-    def __init__(self, name):
-        super().__init__()
-        self.name = name
+from weakref import WeakValueDictionary
 
-    def __str__(self):
-        return str(self.name)
 
-    def __eq__(self, other):
-        return isinstance(other, Atom) and other.name == self.name
+class Formula:
+    __slots__ = ('_hash', '__weakref__')
+
+    # unique table: maps (class, arguments) to the only formula built from them.
+    _unique_table = WeakValueDictionary()
+
+    @staticmethod
+    def _intern(cls, fields, args, key=None):
+        if key is None:
+            key = (cls,) + args
+        formula = Formula._unique_table.get(key)
+        if formula is None:
+            formula = object.__new__(cls)
+            for field, value in zip(fields, args):
+                object.__setattr__(formula, field, value)
+            object.__setattr__(formula, '_hash', hash(key))
+            Formula._unique_table[key] = formula
+        return formula
+
+    def __setattr__(self, name, value):
+        raise AttributeError('formulas are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('formulas are immutable')
 
     def __hash__(self):
-        return hash((self.name, 'atom'))
+        return self._hash
 
+    def __copy__(self):
+        return self
 
-class Implies(Formula):
-
-    def __init__(self, left, right):
-        super().__init__()
-        self.left = left
-        self.right = right
+    def __deepcopy__(self, memo):
+        return self
 
     def __str__(self):
-        return "(" + self.left.__str__() + " " + u"\u2192" + " " + self.right.__str__() + ")"
+        # the pieces of text are produced with an explicit stack, so that deep formulas can be printed
+        pieces = []
+        stack = [self]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, Formula):
+                stack.extend(reversed(current._parts()))
+            else:
+                pieces.append(current)
+        return ''.join(pieces)
 
-    def __eq__(self, other):
-        return isinstance(other, Implies) and other.left == self.left and other.right == self.right
 
-    def __hash__(self):
-        return hash((hash(self.left), hash(self.right), 'implies'))
+class Atom(Formula):
+    """
+    This class represents propositional logic variables.
+    """
+    __slots__ = ('name',)
 
+    def __new__(cls, name):
+        # the type of the name is part of the key, since names such as 1 and True are equal but distinct.
+        return Formula._intern(cls, cls.__slots__, (name,), (cls, type(name), name))
 
-class Not(Formula):
+    def __reduce__(self):
+        return Atom, (self.name,)
 
-    def __init__(self, inner):
-        super().__init__()
-        self.inner = inner
+    @property
+    def args(self):
+        return ()
 
-    def __str__(self):
-        return "(" + u"\u00ac" + str(self.inner) + ")"
+    def _parts(self):
+        return str(self.name),
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and other.inner == self.inner
 
-    def __hash__(self):
-        return hash((hash(self.inner), 'not'))
+class Implies(Formula):
+    __slots__ = ('left', 'right')
 
+    def __new__(cls, left, right):
+        return Formula._intern(cls, cls.__slots__, (left, right))
 
-class And(Formula):
+    def __reduce__(self):
+        return Implies, (self.left, self.right)
 
-    def __init__(self, left, right):
-        super().__init__()
-        self.left = left
-        self.right = right
+    @property
+    def args(self):
+        return self.left, self.right
 
-    def __str__(self):
-        return "(" + self.left.__str__() + " " + u"\u2227" + " " + self.right.__str__() + ")"
+    def _parts(self):
+        return "(", self.left, " " + u"\u2192" + " ", self.right, ")"
 
-    def __eq__(self, other):
-        return isinstance(other, And) and other.left == self.left and other.right == self.right
 
-    def __hash__(self):
-        return hash((hash(self.left), hash(self.right), 'and'))
+class Not(Formula):
+    __slots__ = ('inner',)
 
+    def __new__(cls, inner):
+        return Formula._intern(cls, cls.__slots__, (inner,))
 
-class Or(Formula):
+    def __reduce__(self):
+        return Not, (self.inner,)
 
-    def __init__(self, left, right):
-        super().__init__()
-        self.left = left
-        self.right = right
+    @property
+    def args(self):
+        return self.inner,
 
-    def __str__(self):
-        return "(" + self.left.__str__() + " " + u"\u2228" + " " + self.right.__str__() + ")"
+    def _parts(self):
+        return "(" + u"\u00ac", self.inner, ")"
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and other.left == self.left and other.right == self.right
 
-    def __hash__(self):
-        return hash((hash(self.left), hash(self.right), 'or'))
+class NaryFormula(Formula):
+    """
+    Base class of the associative connectives And and Or, which take two or more formulas.
+    left is the first formula and right is the connective applied to the remaining ones,
+    so that And(p, q, r) can also be handled as (p ∧ (q ∧ r)).
+    """
+    __slots__ = ('args',)
+    symbol = None
+
+    def __new__(cls, *args):
+        if len(args) < 2:
+            raise TypeError(cls.__name__ + ' requires at least two formulas')
+        return Formula._intern(cls, NaryFormula.__slots__, (args,))
+
+    def __reduce__(self):
+        return type(self), self.args
+
+    @property
+    def left(self):
+        return self.args[0]
+
+    @property
+    def right(self):
+        if len(self.args) == 2:
+            return self.args[1]
+        return type(self)(*self.args[1:])
+
+    def _parts(self):
+        parts = ["("]
+        for arg in self.args:
+            parts.append(arg)
+            parts.append(" " + self.symbol + " ")
+        parts[-1] = ")"
+        return parts
+
+
+class And(NaryFormula):
+    __slots__ = ()
+    symbol = u"\u2227"
+
+
+class Or(NaryFormula):
+    __slots__ = ()
+    symbol = u"\u2228"
+
+
+def _join(cls, formulas):
+    args = []
+    for formula in formulas:
+        if isinstance(formula, cls):
+            args.extend(formula.args)
+        else:
+            args.append(formula)
+    if not args:
+        raise ValueError(cls.__name__ + ' of an empty list of formulas')
+    if len(args) == 1:
+        return args[0]
+    return cls(*args)
+
+
+def and_all(formulas):
+    """Returns a single n-ary And of a list of formulas.
+    Conjunctions in the list are merged into the result, so and_all([And(p, q), r]) is And(p, q, r).
+    The conjunction of a single formula is the formula itself."""
+    return _join(And, formulas)
+
+
+def or_all(formulas):
+    """Returns a single n-ary Or of a list of formulas.
+    Disjunctions in the list are merged into the result, so or_all([Or(p, q), r]) is Or(p, q, r).
+    The disjunction of a single formula is the formula itself."""
+    return _join(Or, formulas)
 
 
 class Iff:
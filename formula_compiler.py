@@ -0,0 +1,123 @@
+"""The goal in this module is to compile a formula into a specialised Python function that
+computes its truth value, so that evaluating the same formula many times does not walk the formula objects.
+
+For example, compile_formula(Implies(Atom('p'), Or(Atom('p'), Atom('s')))) generates and compiles
+
+    def evaluate(values):
+        v0, v1, = values
+        r2 = v0 or v1
+        r3 = not v0 or r2
+        return r3
+
+where values is an assignment vector: the truth values of the atoms in the order of the list atoms, here ['p', 's'].
+The generated code is straight-line (one statement per distinct subformula, taken from compile_postfix),
+so formulas of any depth can be compiled. Compiled formulas are cached per formula.
+
+Compiling costs much more than one evaluation, so semantics.truth_value only compiles formulas that are evaluated
+more than a few times, and never formulas with more than COMPILE_MAX_NODES distinct subformulas, whose source
+would take longer to compile than they would ever save. It evaluates the others with their postfix programs,
+which are cached too.
+"""
+
+from weakref import WeakKeyDictionary
+
+from postfix import ATOM, NOT, AND, OR, compile_postfix
+
+# number of times a formula is evaluated by semantics.truth_value before it is compiled.
+COMPILE_THRESHOLD = 3
+
+# formulas with more distinct subformulas than this are never compiled by evaluator.
+COMPILE_MAX_NODES = 10000
+
+_compiled = WeakKeyDictionary()
+_evaluations = WeakKeyDictionary()
+_programs = WeakKeyDictionary()
+
+
+class CompiledFormula:
+    """A formula compiled into a Python function.
+    Calling it with an assignment vector (truth values indexed by the positions in atoms) returns the truth value."""
+
+    __slots__ = ('function', 'atoms', 'slots', 'source')
+
+    def __init__(self, function, atoms, source):
+        self.function = function
+        self.atoms = atoms
+        self.slots = {name: slot for slot, name in enumerate(atoms)}
+        self.source = source
+
+    def __call__(self, values):
+        return self.function(values)
+
+    def assignment(self, interpretation):
+        """Converts an interpretation such as {'p': True, 'q': False} into an assignment vector."""
+        return [interpretation.get(name) for name in self.atoms]
+
+    def evaluate(self, interpretation):
+        """Determines the truth value of the compiled formula in an interpretation (dictionary)."""
+        return self.function([interpretation.get(name) for name in self.atoms])
+
+
+def generate_source(program):
+    """Returns the source code of the function evaluate(values) for a PostfixFormula."""
+    operands = program.operands
+    starts = program.starts
+    names = []
+    lines = ['def evaluate(values):',
+             '    ' + ''.join('v%d, ' % slot for slot in range(len(program.atoms))) + '= values']
+    for i, opcode in enumerate(program.opcodes):
+        if opcode == ATOM:
+            names.append('v%d' % operands[starts[i]])
+            continue
+        args = [names[operands[j]] for j in range(starts[i], starts[i + 1])]
+        if opcode == NOT:
+            expression = 'not ' + args[0]
+        elif opcode == AND:
+            expression = ' and '.join(args)
+        elif opcode == OR:
+            expression = ' or '.join(args)
+        else:
+            expression = 'not ' + args[0] + ' or ' + args[1]
+        names.append('r%d' % i)
+        lines.append('    r%d = %s' % (i, expression))
+    lines.append('    return ' + names[-1])
+    return '\n'.join(lines) + '\n'
+
+
+def compile_formula(formula):
+    """Returns the CompiledFormula of a formula, compiling it on the first call."""
+    compiled = _compiled.get(formula)
+    if compiled is None:
+        program = postfix_program(formula)
+        source = generate_source(program)
+        namespace = {}
+        exec(compile(source, '<compiled formula>', 'exec'), namespace)
+        compiled = CompiledFormula(namespace['evaluate'], program.atoms, source)
+        _compiled[formula] = compiled
+    return compiled
+
+
+def postfix_program(formula):
+    """Returns the PostfixFormula of a formula (see postfix.py), building it on the first call."""
+    program = _programs.get(formula)
+    if program is None:
+        program = _programs[formula] = compile_postfix(formula)
+    return program
+
+
+def evaluator(formula):
+    """Counts one more evaluation of formula, and returns an object whose method evaluate(interpretation) computes
+    its truth value: its CompiledFormula once formula has been evaluated more than COMPILE_THRESHOLD times and if
+    it has at most COMPILE_MAX_NODES distinct subformulas, and its PostfixFormula otherwise."""
+    compiled = _compiled.get(formula)
+    if compiled is not None:
+        return compiled
+    program = postfix_program(formula)
+    if len(program) > COMPILE_MAX_NODES:
+        return program
+    evaluations = _evaluations.get(formula, 0) + 1
+    if evaluations > COMPILE_THRESHOLD:
+        _evaluations.pop(formula, None)
+        return compile_formula(formula)
+    _evaluations[formula] = evaluations
+    return program
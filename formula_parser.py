@@ -0,0 +1,139 @@
+"""The goal in this module is to read formulas of propositional logic from text.
+The notation is the one printed by the formulas themselves, for example
+
+    parse_formula('(p → (p ∨ s))')
+
+returns Implies(Atom('p'), Or(Atom('p'), Atom('s'))). The following ASCII equivalents are also accepted:
+
+    ¬   ~   !
+    ∧   &   /\\
+    ∨   |   \\/
+    →   ->  =>
+
+Parentheses are optional: ¬ binds tighter than ∧, which binds tighter than ∨, which binds tighter than →,
+and → associates to the right. A chain of the same associative connective, such as p ∧ q ∧ r,
+gives a single n-ary formula, And(Atom('p'), Atom('q'), Atom('r')), so printing a formula and parsing
+the text gives back the same formula.
+An atom name is any sequence of other characters, and it may contain spaces, as in 'choveu ontem'.
+
+The parser is table driven (shunting-yard) and has no recursion, so it runs in linear time on formulas of any depth.
+"""
+
+import re
+
+from formula import *
+
+NOT = 'not'
+AND = 'and'
+OR = 'or'
+IMPLIES = 'implies'
+
+OPERATORS = {u'¬': NOT, '~': NOT, '!': NOT,
+             u'∧': AND, '&': AND, '/\\': AND,
+             u'∨': OR, '|': OR, '\\/': OR,
+             u'→': IMPLIES, '->': IMPLIES, '=>': IMPLIES}
+
+PRECEDENCE = {NOT: 4, AND: 3, OR: 2, IMPLIES: 1}
+CONNECTIVES = {AND: And, OR: Or, IMPLIES: Implies}
+
+_NAME_CHAR = r'(?:(?!->|=>|/\\|\\/)[^\s()¬~!∧&∨|→])'
+_TOKEN = re.compile(r'\s*(?:(?P<operator>->|=>|/\\|\\/|[¬~!∧&∨|→])'
+                    r'|(?P<open>\()|(?P<close>\))'
+                    r'|(?P<name>' + _NAME_CHAR + r'+(?:[ \t]+' + _NAME_CHAR + r'+)*)'
+                    r'|(?P<error>\S))')
+
+
+def tokenize(text):
+    """Yields the tokens of a text as pairs (kind, value, position),
+    where kind is 'operator', 'open', 'close' or 'name'."""
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind is None:  # trailing whitespace
+            continue
+        if kind == 'error':
+            raise ValueError('unexpected character %r at position %d' % (match.group(kind), match.start(kind)))
+        yield kind, match.group(kind), match.start(kind)
+
+
+def parse_formula(text):
+    """Returns the formula written in text. Raises ValueError if the text is not a well-formed formula."""
+
+    operands = []
+    operators = []  # entries [operator, number of operands, position]; '(' marks an open parenthesis
+    expect_operand = True
+
+    def reduce():
+        operator, count, _ = operators.pop()
+        if operator == NOT:
+            operands.append(Not(operands.pop()))
+            return
+        args = operands[-count:]
+        del operands[-count:]
+        operands.append(CONNECTIVES[operator](*args))
+
+    for kind, value, position in tokenize(text):
+        if kind == 'name':
+            if not expect_operand:
+                raise ValueError('missing connective before %r at position %d' % (value, position))
+            operands.append(Atom(value))
+            expect_operand = False
+        elif kind == 'open':
+            if not expect_operand:
+                raise ValueError('missing connective before ( at position %d' % position)
+            operators.append(['(', 0, position])
+        elif kind == 'close':
+            if expect_operand:
+                raise ValueError('missing formula before ) at position %d' % position)
+            while operators and operators[-1][0] != '(':
+                reduce()
+            if not operators:
+                raise ValueError('unbalanced ) at position %d' % position)
+            operators.pop()
+        else:
+            operator = OPERATORS[value]
+            if operator == NOT:
+                if not expect_operand:
+                    raise ValueError('missing connective before %s at position %d' % (value, position))
+                operators.append([NOT, 1, position])
+                continue
+            if expect_operand:
+                raise ValueError('missing formula before %s at position %d' % (value, position))
+            precedence = PRECEDENCE[operator]
+            while operators and operators[-1][0] != '(':
+                top = operators[-1][0]
+                if PRECEDENCE[top] > precedence or (PRECEDENCE[top] == precedence and operator != IMPLIES and top != operator):
+                    reduce()
+                else:
+                    break
+            if operators and operators[-1][0] == operator and operator != IMPLIES:
+                operators[-1][1] += 1
+            else:
+                operators.append([operator, 2, position])
+            expect_operand = True
+
+    if expect_operand:
+        raise ValueError('unexpected end of formula')
+    while operators:
+        if operators[-1][0] == '(':
+            raise ValueError('unbalanced ( at position %d' % operators[-1][2])
+        reduce()
+    return operands[0]
+
+
+def parse_formulas(lines):
+    """Yields the formulas written in an iterable of lines, one formula per line.
+    Blank lines and lines starting with # are skipped."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        try:
+            yield parse_formula(line)
+        except ValueError as error:
+            raise ValueError('line %d: %s' % (number, error))
+
+
+def parse_file(path):
+    """Returns the list of formulas written in a text file, one formula per line."""
+    with open(path, encoding='utf-8') as file:
+        return list(parse_formulas(file))
@@ -1,17 +1,53 @@
 """The goal in this module is to define functions that take a formula as input and
-do some computation on its syntactic structure. """
+do some computation on its syntactic structure.
+
+All functions are built on postorder and fold below, which traverse a formula with an explicit
+stack and visit each distinct subformula once. Hence they run in time linear in the number of
+distinct subformulas, and formulas of any depth can be analysed without RecursionError. """
 
 
 from formula import *
 
+
+def postorder(formula):
+    """Returns the list of the distinct subformulas of a formula in postorder,
+    that is, every subformula appears after its immediate subformulas and the formula itself is the last one.
+    Subformulas that are shared are listed only once."""
+
+    order = []
+    visited = set()
+    stack = [(formula, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if current in visited:
+            continue
+        if expanded or not current.args:
+            visited.add(current)
+            order.append(current)
+            continue
+        stack.append((current, True))
+        for arg in reversed(current.args):
+            if arg not in visited:
+                stack.append((arg, False))
+    return order
+
+
+def fold(formula, combine):
+    """Computes a value for each distinct subformula, bottom-up, and returns the value of the formula.
+    combine(subformula, values) receives the list with the values of the immediate subformulas
+    (an empty list for atoms). For example, fold(formula, lambda f, values: 1 + sum(values))
+    counts the nodes of the syntax tree of formula."""
+
+    values = {}
+    for current in postorder(formula):
+        values[current] = combine(current, [values[arg] for arg in current.args])
+    return values[formula]
+
+
 def length(formula):
-    """Determines the length of a formula in propositional logic."""
-    if isinstance(formula, Atom):
-        return 1
-    if isinstance(formula, Not):
-        return length(formula.inner) + 1
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return length(formula.left) + length(formula.right) + 1
+    """Determines the length of a formula in propositional logic.
+    An n-ary And or Or counts as the n - 1 binary connectives it abbreviates."""
+    return fold(formula, lambda current, values: sum(values) + max(len(values) - 1, 1))
 
 
 def subformulas(formula):
@@ -27,14 +63,7 @@ def subformulas(formula):
     (Note that there is no repetition of p)
     """
 
-    if isinstance(formula, Atom):
-        return {formula}
-    if isinstance(formula, Not):
-        return {formula}.union(subformulas(formula.inner))
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        sub1 = subformulas(formula.left)
-        sub2 = subformulas(formula.right)
-        return {formula}.union(sub1).union(sub2)
+    return set(postorder(formula))
 
 #  we have shown in class that, for all formula A, len(subformulas(A)) <= length(A).
 
@@ -52,26 +81,17 @@ def atoms(formula):
     (Note that there is no repetition of p)
     """
 
-    if isinstance(formula, Atom):
-        return {formula.__str__()}
-    if isinstance(formula, Not):
-        return atoms(formula.inner)
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return atoms(formula.left).union(atoms(formula.right))
+    return {current.__str__() for current in postorder(formula) if isinstance(current, Atom)}
 
 
 def number_of_binary_connectives(formula):
     """Returns the number of binary connectives in a formula.
     Binary connectives are connectives thay join two sentences.
     For example: number_of_binary_connectives((p → (¬q))) = 1.
+    An n-ary And or Or counts as n - 1 binary connectives.
     """
 
-    if isinstance(formula, Atom):
-        return 0
-    if isinstance(formula, Not):
-        return number_of_binary_connectives(formula.inner)
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return number_of_binary_connectives(formula.left) + number_of_binary_connectives(formula.right) + 1
+    return fold(formula, lambda current, values: sum(values) + max(len(values) - 1, 0))
 
 
 def number_of_atoms(formula):
@@ -82,58 +102,42 @@ def number_of_atoms(formula):
     must return 3 (Observe that this function counts the repetitions of atoms)
     """
 
-    if isinstance(formula, Atom):
-        return 1
-    if isinstance(formula, Not):
-        return number_of_atoms(formula.inner)
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return number_of_atoms(formula.left) + number_of_atoms(formula.right)
+    return fold(formula, lambda current, values: sum(values) if values else 1)
 
 
 def number_of_connectives(formula):
-    """Returns the number of connectives occurring in a formula."""
+    """Returns the number of connectives occurring in a formula.
+    An n-ary And or Or counts as the n - 1 binary connectives it abbreviates."""
 
-    if isinstance(formula, Atom):
-        return 0
-    if isinstance(formula, Not):
-        return number_of_connectives(formula.inner) + 1
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return number_of_connectives(formula.left) + number_of_connectives(formula.right) + 1
+    return fold(formula, lambda current, values: sum(values) + max(len(values) - 1, 1) if values else 0)
 
 
 def is_literal(formula):
     """Returns True if formula is a literal. It returns False, otherwise"""
-    if isinstance(formula, Atom):
-        return True
-    if isinstance(formula, Not):
-        if isinstance(formula.inner, Atom):
+
+    def combine(current, values):
+        if isinstance(current, Atom):
             return True
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return is_literal(formula.left) and is_literal(formula.right)
-    return False
+        if isinstance(current, Not):
+            return isinstance(current.inner, Atom)
+        return all(values)
+
+    return fold(formula, combine)
 
 
 def substitution(formula, old_subformula, new_subformula):
     """Returns a new formula obtained by replacing all occurrences
-    of old_subformula in the input formula by new_subformula."""
+    of old_subformula in the input formula by new_subformula.
+    Formulas are immutable, so the input formula is left unchanged."""
 
-    if isinstance(formula, Atom):
-        return
-    if isinstance(formula, Not):
-        if formula.inner == old_subformula:
-            formula.inner = new_subformula
-        else:
-            substitution(formula.inner, old_subformula, new_subformula)
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        if formula.left == old_subformula:
-            formula.left = new_subformula
-        else:
-            substitution(formula.left, old_subformula, new_subformula)
-        if formula.right == old_subformula:
-            formula.right == new_subformula
-        else:
-            substitution(formula.right, old_subformula, new_subformula)
-    return formula
+    def combine(current, values):
+        if current == old_subformula:
+            return new_subformula
+        if isinstance(current, Atom):
+            return current
+        return type(current)(*values)
+
+    return fold(formula, combine)
 
 
 def is_clause(formula):
@@ -144,7 +148,7 @@ def is_clause(formula):
     if isinstance(formula, Not):
         return is_literal(formula)
     if isinstance(formula, Or):
-        return is_literal(formula.left) and is_literal(formula.right)
+        return all(is_literal(arg) for arg in formula.args)
     return False
 
 
@@ -152,12 +156,12 @@ def is_negation_normal_form(formula):
     """Returns True if formula is in negation normal form.
     Returns False, otherwise."""
 
-    if isinstance(formula, Atom):
-        return True
-    if isinstance(formula, Not):
-        return isinstance(formula.inner, Atom)
-    if isinstance(formula, Implies) or isinstance(formula, And) or isinstance(formula, Or):
-        return is_negation_normal_form(formula.left) and is_negation_normal_form(formula.right)
+    def combine(current, values):
+        if isinstance(current, Not):
+            return isinstance(current.inner, Atom)
+        return all(values)
+
+    return fold(formula, combine)
 
 
 def is_cnf(formula):
@@ -169,21 +173,23 @@ def is_cnf(formula):
     if isinstance(formula, Not):
         return is_clause(formula)
     if isinstance(formula, And):
-        if is_clause(formula.left) and is_clause(formula.right):
+        if all(is_clause(arg) for arg in formula.args):
             return True
     return False
 
 def is_term(formula):
     """Returns True if formula is a term. It returns False, otherwise"""
 
-    if isinstance(formula, Atom):
-        return True
-    if isinstance(formula, Not):
-        return is_literal(formula)
-    if isinstance(formula, And):
-        if is_literal(formula.left) and is_literal(formula.right):
-            return is_term(formula.left) and is_term(formula.right)
-    return False
+    def combine(current, values):
+        if isinstance(current, Atom):
+            return True
+        if isinstance(current, Not):
+            return isinstance(current.inner, Atom)
+        if isinstance(current, And):
+            return all(values)
+        return False
+
+    return fold(formula, combine)
 
 
 def is_dnf(formula):
@@ -195,28 +201,50 @@ def is_dnf(formula):
     if isinstance(formula, Not):
         return is_term(formula)
     if isinstance(formula, Or):
-        if isinstance(formula.left, Or):
-            sub1 = is_dnf(formula.left)
-        else:
-            sub1 = is_term(formula.left)
-        if isinstance(formula.right, Or):
-            sub2 = is_dnf(formula.right)
-        else:
-            sub2 = is_term(formula.right)
-        return sub1 and sub2
+        stack = [formula]
+        while stack:
+            for arg in stack.pop().args:
+                if isinstance(arg, Or):
+                    stack.append(arg)
+                elif not is_term(arg):
+                    return False
+        return True
     return False
 
 
 
 def is_decomposable_negation_normal_form(formula):
-    """Returns True if formula is in decomposable negation normal form.
+    """Returns True if formula is in decomposable negation normal form,
+    that is, it is in negation normal form and the conjuncts of each conjunction share no atoms.
     Returns False, otherwise."""
 
-    if is_negation_normal_form(formula):
-        if isinstance(formula, And):
-            if not len(set(atoms(formula.left)).intersection(atoms(formula.right))):
-                return True
-        if isinstance(formula, Or):
-            return is_decomposable_negation_normal_form(formula.left) and is_decomposable_negation_normal_form(formula.right)
-    return False
+    if not is_negation_normal_form(formula) or any(isinstance(current, Implies) for current in postorder(formula)):
+        return False
+
+    def combine(current, values):  # values are the sets of atoms of the immediate subformulas, or None
+        if isinstance(current, Atom):
+            return frozenset([current])
+        if None in values:
+            return None
+        if isinstance(current, And) and sum(len(value) for value in values) != len(frozenset().union(*values)):
+            return None
+        return frozenset().union(*values)
+
+    return fold(formula, combine) is not None
+
+
+def flatten(formula):
+    """Returns an equivalent formula in which nested conjunctions and nested disjunctions
+    are merged into single n-ary And and Or formulas.
+    For example, flatten(And(And(p, q), Or(r, Or(s, t)))) is And(p, q, Or(r, s, t))."""
+
+    def combine(current, values):
+        if isinstance(current, Atom):
+            return current
+        if isinstance(current, And):
+            return and_all(values)
+        if isinstance(current, Or):
+            return or_all(values)
+        return type(current)(*values)
 
+    return fold(formula, combine)
@@ -0,0 +1,146 @@
+"""The goal in this module is to enumerate the models of a formula lazily, in constant memory.
+
+The interpretations are visited in Gray code order, so that consecutive interpretations differ in the
+truth value of exactly one atom. The truth values of all subformulas are kept between steps, and when an atom
+changes only the subformulas whose truth value actually changes are re-evaluated (a conjunction or disjunction
+keeps the number of its true arguments, so it is updated in constant time).
+For example,
+
+    for model in gray_code_models(Or(Atom('p'), Atom('q'))):
+        print(model)
+
+prints the three models of (p ∨ q), one at a time, and the loop can stop at any moment.
+"""
+
+from heapq import heappop, heappush
+
+from formula import *
+from postfix import ATOM, NOT, AND, OR, compile_postfix
+
+
+class IncrementalEvaluator:
+    """Keeps the truth values of all subformulas of a formula under an assignment of its atoms,
+    updating them when the truth value of one atom changes. All atoms start false."""
+
+    def __init__(self, formula):
+        program = compile_postfix(formula)
+        self.atoms = program.atoms
+        self.slots = program.slots
+        self.opcodes = program.opcodes
+        size = len(program)
+        self.args = [list(program.operands[program.starts[i]:program.starts[i + 1]]) for i in range(size)]
+        self.parents = [[] for _ in range(size)]
+        self.atom_nodes = [[] for _ in self.atoms]  # instructions that read each atom
+        for i in range(size):
+            if self.opcodes[i] == ATOM:
+                self.atom_nodes[self.args[i][0]].append(i)
+            else:
+                for arg in self.args[i]:
+                    self.parents[arg].append(i)
+        self.assignment = [False] * len(self.atoms)
+        self.values = [False] * size
+        self.true_args = [0] * size  # number of true arguments of each And and Or
+        for i in range(size):
+            self.values[i] = self._compute(i)
+
+    def _compute(self, i):
+        opcode = self.opcodes[i]
+        args = self.args[i]
+        if opcode == ATOM:
+            return self.assignment[args[0]]
+        if opcode == NOT:
+            return not self.values[args[0]]
+        if opcode == AND or opcode == OR:
+            self.true_args[i] = sum(1 for arg in args if self.values[arg])
+            return self._connective_value(i)
+        return not self.values[args[0]] or self.values[args[1]]
+
+    def _connective_value(self, i):
+        if self.opcodes[i] == AND:
+            return self.true_args[i] == len(self.args[i])
+        return self.true_args[i] > 0
+
+    @property
+    def value(self):
+        """The truth value of the whole formula."""
+        return self.values[-1]
+
+    def flip(self, slot):
+        """Changes the truth value of the atom in position slot and updates the subformulas that depend on it."""
+        self.assignment[slot] = not self.assignment[slot]
+        values = self.values
+        opcodes = self.opcodes
+        true_args = self.true_args
+        queue = []
+        queued = set()
+        for i in self.atom_nodes[slot]:
+            heappush(queue, i)
+            queued.add(i)
+        # subformulas are processed in postfix order, so each one is recomputed at most once.
+        while queue:
+            i = heappop(queue)
+            queued.discard(i)
+            opcode = opcodes[i]
+            if opcode == AND or opcode == OR:
+                value = self._connective_value(i)
+            elif opcode == ATOM:
+                value = self.assignment[slot]
+            else:
+                value = self._compute(i)
+            if value == values[i]:
+                continue
+            values[i] = value
+            for parent in self.parents[i]:
+                if opcodes[parent] == AND or opcodes[parent] == OR:
+                    true_args[parent] += 1 if value else -1
+                if parent not in queued:
+                    heappush(queue, parent)
+                    queued.add(parent)
+
+
+def _gray_bit(step, bits):
+    """Returns the bit that changes at a given step of the cyclic Gray code on bits bits."""
+    step %= 1 << bits
+    if step == 0:
+        return bits - 1
+    return (step & -step).bit_length() - 1
+
+
+def gray_code_models(formula, project=None):
+    """Yields the models of formula, as dictionaries, visiting the interpretations in Gray code order.
+    If project is a list of atoms (or atom names), each model is restricted to those atoms,
+    and every restricted model is yielded once, as soon as one of its extensions satisfies formula.
+    Memory does not depend on the number of models."""
+
+    evaluator = IncrementalEvaluator(formula)
+    names = [str(name) for name in evaluator.atoms]
+    if project is None:
+        outer = list(range(len(names)))
+        projected = names
+    else:
+        projected = [str(atom.name) if isinstance(atom, Atom) else str(atom) for atom in project]
+        position = {name: slot for slot, name in enumerate(names)}
+        outer = [position.get(name) for name in projected]  # None for atoms that do not occur in formula
+    inner = sorted(set(range(len(names))).difference(slot for slot in outer if slot is not None))
+    free = [False] * len(outer)  # truth values of projected atoms that do not occur in formula
+
+    inner_step = 0
+    for step in range(1 << len(outer)):
+        if step:
+            k = _gray_bit(step, len(outer))
+            if outer[k] is None:
+                free[k] = not free[k]
+            else:
+                evaluator.flip(outer[k])
+        # looks for an extension of the current assignment of the projected atoms that is a model.
+        found = evaluator.value
+        if inner:
+            for _ in range((1 << len(inner)) - 1):
+                if found:
+                    break
+                inner_step += 1
+                evaluator.flip(inner[_gray_bit(inner_step, len(inner))])
+                found = evaluator.value
+        if found:
+            yield {name: free[k] if outer[k] is None else evaluator.assignment[outer[k]]
+                   for k, name in enumerate(projected)}
@@ -0,0 +1,122 @@
+"""The goal in this module is to answer many entailment queries against the same premises efficiently.
+
+A knowledge base transforms its premises into clauses (see tseitin.py) once and keeps them in an
+incremental CDCL solver (see cdcl.py). Each query only adds the clauses of the new conclusion and is
+solved under an assumption, so the clauses learned while answering one query are reused by the next ones.
+For example,
+
+    kb = KnowledgeBase([Implies(Atom('p'), Atom('q')), Atom('p')])
+    kb.entails(Atom('q'))        # True
+    kb.entails(Not(Atom('q')))   # False
+    kb.backbone()                # [p, q], the literals true in every model
+
+Cardinality and pseudo-Boolean constraints on formulas can also be added (see add_at_least), and are handled
+by the solver without being transformed into clauses.
+"""
+
+from formula import *
+from cdcl import Solver
+from tseitin import NEGATIVE, TseitinEncoder
+
+
+class KnowledgeBase:
+    """A set of premises stored as clauses in an incremental SAT solver.
+    It has the methods new_var, variable and add_clause of CNF, so the Tseitin encoder writes the clauses
+    directly into the solver."""
+
+    def __init__(self, premises=(), **options):
+        self.solver = Solver(**options)
+        self.names = {}  # variable -> name of the atom it represents
+        self.variables = {}  # name of an atom -> variable
+        self.encoder = TseitinEncoder(self)
+        for premise in premises:
+            self.add(premise)
+
+    def new_var(self, name=None):
+        variable = self.solver.new_var()
+        if name is not None:
+            self.names[variable] = name
+            self.variables[name] = variable
+        return variable
+
+    def variable(self, name):
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.new_var(name)
+        return variable
+
+    def add_clause(self, clause):
+        self.solver.add_clause(clause)
+
+    def add(self, formula):
+        """Adds formula to the premises."""
+        self.encoder.add(formula)
+
+    def add_at_least(self, formulas, k):
+        """Adds to the premises that at least k of the formulas are true. Like the methods add_at_most,
+        add_exactly and add_pb, it gives the constraint to the solver as it is (see cdcl.py), instead of
+        encoding it into clauses."""
+        self.solver.add_at_least([self.encoder.literal(formula) for formula in formulas], k)
+
+    def add_at_most(self, formulas, k):
+        """Adds to the premises that at most k of the formulas are true."""
+        self.solver.add_at_most([self.encoder.literal(formula) for formula in formulas], k)
+
+    def add_exactly(self, formulas, k):
+        """Adds to the premises that exactly k of the formulas are true."""
+        self.solver.add_exactly([self.encoder.literal(formula) for formula in formulas], k)
+
+    def add_pb(self, formulas, weights, bound):
+        """Adds to the premises that the sum of the weights of the true formulas is at least bound."""
+        self.solver.add_pb([self.encoder.literal(formula) for formula in formulas], weights, bound)
+
+    def entails(self, conclusion):
+        """Returns True if conclusion is a logical consequence of the premises. Otherwise, it returns False."""
+        # the clauses only state that the literal is implied by the conclusion, so assuming the literal false
+        # makes the conclusion false, and the premises entail the conclusion if that is unsatisfiable.
+        literal = self.encoder.literal(conclusion, NEGATIVE)
+        return not self.solver.solve([-literal])
+
+    def satisfiable(self):
+        """Returns an interpretation of the atoms of the premises that satisfies all of them, or False if there
+        is none."""
+        if not self.solver.solve():
+            return False
+        model = self.solver.model
+        return {name: model[variable - 1] > 0 for name, variable in self.variables.items()}
+
+    def backbone(self, atoms=None):
+        """Returns the list of the literals (atoms or negations of atoms) that are true in every model of the
+        premises, or False if the premises are unsatisfiable. Only the given atoms (or atom names) are
+        considered; by default, all atoms of the premises.
+
+        Every literal of the backbone is true in the first model found, so only its literals are candidates.
+        Each candidate is tested by solving under its negation: a model found in this way also discards the
+        other candidates it falsifies, and a candidate that cannot be falsified is added as a unit clause,
+        which helps the next tests."""
+
+        solver = self.solver
+        if not solver.solve():
+            return False
+        if atoms is None:
+            names = list(self.variables)
+        else:
+            names = [atom.name if isinstance(atom, Atom) else atom for atom in atoms]
+        model = solver.model
+        candidates = {}  # literal -> name, for the literals that may still be in the backbone
+        for name in names:
+            variable = self.variables.get(name)
+            if variable is None:  # an atom that does not occur in the premises is never in the backbone
+                continue
+            candidates[model[variable - 1]] = name
+        backbone = []
+        while candidates:
+            literal, name = candidates.popitem()
+            if solver.solve([-literal]):
+                model = solver.model
+                for other in [other for other in candidates if model[abs(other) - 1] != other]:
+                    del candidates[other]
+            else:
+                solver.add_clause([literal])
+                backbone.append(Atom(name) if literal > 0 else Not(Atom(name)))
+        return sorted(backbone, key=str)
@@ -0,0 +1,154 @@
+"""The goal in this module is to solve weighted MaxSAT problems: given hard formulas, which must be true, and
+soft formulas with positive weights, find an interpretation that satisfies the hard formulas and minimises the
+total weight of the soft formulas it falsifies (its cost). Timetabling and scheduling models are of this kind:
+the hard formulas are the rules, and the soft ones are preferences.
+
+The solver is core-guided, in the style of OLL (as in the RC2 solver). Each soft formula is represented by a
+literal (see tseitin.py), and the incremental SAT solver of cdcl.py is called with the soft literals as
+assumptions. If it fails, its core is a set of soft literals that cannot all be true, so the cost is at least the
+smallest weight w of the core. That weight is taken from every literal of the core (a literal whose weight reaches
+0 is no longer assumed), and a totalizer (see cardinality.py) counts the false literals of the core: its output
+"at most 1 false literal" becomes a new soft literal of weight w. When a core contains such an output "at most j",
+the output "at most j + 1" of the same totalizer is added in its place. The first time the solver succeeds with
+all soft literals of positive weight, the model is optimal. The cores are found as in weight-aware core
+extraction: the totalizers of the cores are only built once the solver succeeds again, so that, in between,
+consecutive calls only differ in the assumptions removed by each core, and the solver does not propagate the
+assumptions before them again (see solve in cdcl.py).
+
+With stratification, only the soft literals with the largest weights are assumed at first, and the lighter ones are
+added once the solver succeeds with them. Each of these models is reported, with its cost, as the best model found
+so far, so a long run can be stopped at any time with a good model. For example,
+
+    problem = MaxSAT([Or(Atom('p'), Atom('q'))])
+    problem.add_soft(Not(Atom('p')), 2)
+    problem.add_soft(Not(Atom('q')), 1)
+    problem.solve()        # {'p': False, 'q': True}, and problem.cost is 1
+"""
+
+from cardinality import totalizer
+from knowledge_base import KnowledgeBase
+
+# a core with more literals than this is shrunk by solving again under it, at most CORE_TRIMMING times.
+TRIMMED_CORE_SIZE = 8
+CORE_TRIMMING = 3
+
+
+class MaxSAT(KnowledgeBase):
+    """A weighted MaxSAT problem: hard formulas (the premises of the knowledge base) and soft formulas with
+    weights. After solve, cost is the cost of the best model found, model is its interpretation and lower_bound
+    is the smallest cost that any model may have (equal to cost once the model is known to be optimal)."""
+
+    def __init__(self, hard=(), soft=(), **options):
+        KnowledgeBase.__init__(self, hard, **options)
+        self.soft = {}  # literal -> weight of the soft formulas it represents
+        for formula, weight in soft:
+            self.add_soft(formula, weight)
+        self.cost = None
+        self.model = None
+        self.lower_bound = 0
+
+    def add_hard(self, formula):
+        """Adds a formula that must be true."""
+        self.add(formula)
+
+    def add_soft(self, formula, weight=1):
+        """Adds a formula whose falsification costs weight (a positive number)."""
+        if weight < 0:
+            raise ValueError('soft formulas must have positive weights')
+        if weight:
+            literal = self.encoder.literal(formula)
+            self.soft[literal] = self.soft.get(literal, 0) + weight
+
+    def solve(self, on_model=None):
+        """Returns an interpretation (a dict from atom names to truth values) that satisfies the hard formulas and
+        has the smallest cost, or False if the hard formulas are unsatisfiable.
+        Each time a better model is found, on_model(cost, interpretation) is called, if given."""
+
+        solver = self.solver
+        weights = dict(self.soft)  # assumption literal -> weight still to be paid if it is false
+        sums = {}  # assumption 'fewer than j of inputs are true' -> (inputs, outputs, j) of its totalizer
+        cores = []  # cores found since the last model, with their weights, whose totalizers are not built yet
+        self.cost = self.model = None
+        self.lower_bound = 0
+        threshold = max(weights.values(), default=0)
+        assumptions = None
+        while True:
+            if assumptions is None:
+                assumptions = [literal for literal, weight in weights.items() if weight >= threshold]
+            if solver.solve(assumptions):
+                self._improve(solver.model, on_model)
+                assumptions = None
+                if cores:
+                    for core, weight in cores:
+                        self._relax(core, weight, weights, sums)
+                    cores = []
+                    continue
+                lighter = [weight for weight in weights.values() if weight < threshold]
+                if not lighter:
+                    self.lower_bound = self.cost
+                    return self.model
+                threshold = max(lighter)
+                continue
+            core = solver.core
+            if len(core) > TRIMMED_CORE_SIZE:
+                core = self._trim(core)
+            if not core:
+                return self.model if self.model is not None else False
+            weight = min(weights[literal] for literal in core)
+            self.lower_bound += weight
+            for literal in core:
+                weights[literal] -= weight
+                if weights[literal] < threshold:
+                    assumptions.remove(literal)
+                if not weights[literal]:
+                    del weights[literal]
+            cores.append((core, weight))
+
+    def _relax(self, core, weight, weights, sums):
+        """Adds the soft literals that count the false literals of core (each with weight)."""
+        for literal in core:
+            if literal in sums:  # "fewer than j true inputs" is false: relax it to "fewer than j + 1"
+                inputs, outputs, j = sums[literal]
+                self._count_false(inputs, j + 1, weight, weights, sums, outputs)
+        if len(core) > 1:
+            outputs = self._count_false([-literal for literal in core], 2, weight, weights, sums)
+            self.solver.add_clause([outputs[0]])  # the hard formulas already imply that some literal is false
+
+    def _count_false(self, inputs, j, weight, weights, sums, outputs=()):
+        """Adds the soft literal "fewer than j of inputs are true" with weight, if j <= len(inputs), building
+        a larger totalizer when outputs does not count up to j. Returns the outputs of the totalizer."""
+        if j > len(inputs):
+            return outputs
+        if len(outputs) < j:
+            clauses, outputs = totalizer(inputs, min(2 * j, len(inputs)) - 1, self.new_var)
+            self.solver.add_clauses(clauses)
+        literal = -outputs[j - 1]
+        weights[literal] = weights.get(literal, 0) + weight
+        sums[literal] = (inputs, outputs, j)
+        return outputs
+
+    def _trim(self, core):
+        for _ in range(CORE_TRIMMING):
+            if self.solver.solve(core) or len(self.solver.core) == len(core):
+                break
+            core = self.solver.core
+        return core
+
+    def _improve(self, model, on_model):
+        cost = sum(weight for literal, weight in self.soft.items() if model[abs(literal) - 1] != literal)
+        if self.cost is None or cost < self.cost:
+            self.cost = cost
+            self.model = {name: model[variable - 1] > 0 for name, variable in self.variables.items()}
+            if on_model is not None:
+                on_model(cost, self.model)
+
+
+def maxsat(hard, soft, on_model=None):
+    """Returns a pair (interpretation, cost) with an interpretation that satisfies the hard formulas and minimises
+    the total weight of the falsified soft formulas, given as pairs (formula, weight), or False if the hard
+    formulas are unsatisfiable. on_model is called with each better model found (see MaxSAT.solve)."""
+    problem = MaxSAT(hard, soft)
+    interpretation = problem.solve(on_model)
+    if interpretation is False:
+        return False
+    return interpretation, problem.cost
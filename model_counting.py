@@ -0,0 +1,284 @@
+"""The goal in this module is to count the models of a formula exactly, without listing them.
+
+The formula is transformed into clauses with the full Tseitin transformation (see tseitin.py), which preserves
+the number of models, and the clauses are counted by a DPLL-style search:
+    - unit clauses are propagated after each decision. The clauses are not copied: counters of the true and
+      unassigned literals of each clause are updated in place, and undone when the search backtracks;
+    - the atoms of the formula are decided before the auxiliary variables, which they determine, and, among
+      them, the variable that occurs in the most clauses;
+    - variables that occur in no clause are free, and each one doubles the count;
+    - clauses that share no variable form independent components, whose counts are multiplied. Components
+      with few variables are counted over all their assignments at once, with bitwise operations;
+    - the count of each component is cached, so components that appear again in other branches of the search
+      are not counted again. The cache keeps components up to a given total size and evicts the ones
+      used least recently.
+For example, count_models(Or(Atom('p'), Atom('q'))) returns 3.
+"""
+
+from collections import OrderedDict
+
+from formula import *
+from tseitin import tseitin
+
+# components with at most this many variables are counted over all their assignments at once, as in bitparallel.py.
+SMALL_COMPONENT = 12
+
+# maximum total size (number of variables and clauses) of the components kept in the cache.
+CACHE_SIZE = 1 << 20
+
+
+def normalize(clauses):
+    """Returns the clauses without tautologies and repeated literals, as sorted tuples, split into the list of
+    the longer clauses and the set of the literals of unit clauses; or (None, None) if some clause is empty."""
+    normalized = []
+    units = set()
+    for clause in clauses:
+        if not clause:
+            return None, None
+        clause = set(clause)
+        if any(-literal in clause for literal in clause):
+            continue  # tautology
+        if len(clause) == 1:
+            units.update(clause)
+        else:
+            normalized.append(tuple(sorted(clause)))
+    return normalized, units
+
+
+class Residual:
+    """The clauses of a search under a partial assignment, kept up to date in place as literals are assigned and
+    unassigned, instead of being copied at each decision. The assigned literals are kept on a trail; undo(mark)
+    unassigns them back to an earlier length of the trail, as a backtracking search does."""
+
+    def __init__(self, clauses, num_vars):
+        self.clauses = clauses
+        # lists indexed by literals: index -v wraps around to the second half, so literal and -literal never meet.
+        size = 2 * num_vars + 1
+        self.occurrences = [[] for _ in range(size)]  # literal -> indexes of the clauses in which it occurs
+        self.variable_clauses = [[] for _ in range(num_vars + 1)]  # variable -> indexes of its clauses
+        for index, clause in enumerate(clauses):
+            for literal in clause:
+                self.occurrences[literal].append(index)
+                self.variable_clauses[abs(literal)].append(index)
+        self.clause_variables = [tuple(abs(literal) for literal in clause) for clause in clauses]
+        self.true = [False] * size  # literal -> whether it is assigned true
+        self.assigned = [False] * (num_vars + 1)
+        self.satisfied = [0] * len(clauses)  # clause -> number of its true literals
+        self.unassigned = [len(clause) for clause in clauses]  # clause -> number of its unassigned literals
+        self.trail = []
+        # marks of the last traversal that reached each variable and clause (see components).
+        self.variable_mark = [0] * (num_vars + 1)
+        self.clause_mark = [0] * len(clauses)
+        self.marks = 0
+
+    def assign(self, literal):
+        """Makes literal true and propagates unit clauses. Returns False if some clause becomes false; in either
+        case, the literals made true stay on the trail until undo is called."""
+        true, occurrences, satisfied, unassigned = self.true, self.occurrences, self.satisfied, self.unassigned
+        queue = [literal]
+        consistent = True
+        while queue and consistent:
+            literal = queue.pop()
+            if true[literal]:
+                continue
+            if true[-literal]:
+                return False
+            true[literal] = True
+            self.assigned[abs(literal)] = True
+            self.trail.append(literal)
+            for index in occurrences[literal]:
+                satisfied[index] += 1
+            for index in occurrences[-literal]:  # every counter is updated, even after a conflict, for undo
+                unassigned[index] -= 1
+                if not satisfied[index]:
+                    if not unassigned[index]:
+                        consistent = False
+                    elif unassigned[index] == 1:
+                        for other in self.clauses[index]:
+                            if not true[-other]:
+                                queue.append(other)
+                                break
+        return consistent
+
+    def undo(self, mark):
+        """Unassigns the literals assigned after the trail had length mark."""
+        true, occurrences, satisfied, unassigned, trail = (self.true, self.occurrences, self.satisfied,
+                                                           self.unassigned, self.trail)
+        while len(trail) > mark:
+            literal = trail.pop()
+            true[literal] = False
+            self.assigned[abs(literal)] = False
+            for index in occurrences[literal]:
+                satisfied[index] -= 1
+            for index in occurrences[-literal]:
+                unassigned[index] += 1
+
+    def components(self, variables, prefer=()):
+        """Splits the unassigned variables among variables into groups connected by the clauses that are not
+        satisfied. Returns the number of those variables that occur in no such clause, and a list with a triple
+        (variables, clauses, variable) for each group: its sorted variables, the sorted indexes of its clauses and
+        the variable to decide next, the one in prefer (if any) that occurs in the most clauses."""
+        assigned, satisfied = self.assigned, self.satisfied
+        variable_clauses, clause_variables = self.variable_clauses, self.clause_variables
+        variable_mark, clause_mark = self.variable_mark, self.clause_mark
+        self.marks += 1
+        mark = self.marks
+        preference = len(satisfied) + 1  # more than the number of clauses of any variable
+        free = 0
+        result = []
+        for start in variables:
+            if assigned[start] or variable_mark[start] == mark:
+                continue
+            variable_mark[start] = mark
+            group = [start]
+            group_clauses = []
+            best, best_score = start, -1
+            for variable in group:  # the group grows while it is traversed
+                score = 0
+                for index in variable_clauses[variable]:
+                    if satisfied[index]:
+                        continue
+                    score += 1
+                    if clause_mark[index] != mark:
+                        clause_mark[index] = mark
+                        group_clauses.append(index)
+                        for other in clause_variables[index]:
+                            if variable_mark[other] != mark and not assigned[other]:
+                                variable_mark[other] = mark
+                                group.append(other)
+                if variable in prefer:
+                    score += preference
+                if score > best_score:
+                    best, best_score = variable, score
+            if group_clauses:
+                group.sort()
+                group_clauses.sort()
+                result.append((tuple(group), tuple(group_clauses), best))
+            else:
+                free += 1
+        return free, result
+
+
+class ModelCounter:
+    """Counts the models of sets of clauses of DIMACS literals (see cnf.py).
+    The cache of components is kept between calls of count."""
+
+    def __init__(self, cache_size=CACHE_SIZE, small_component=SMALL_COMPONENT):
+        self.cache = OrderedDict()  # component -> number of models over its variables, in order of use
+        self.clause_ids = {}  # clause -> its number in the keys of the cache, the same in every call of count
+        self.cache_size = cache_size
+        self.small_component = small_component
+        self.lanes = {}  # n -> masks of the assignments of n variables in which each one is true
+        self.cached_size = 0
+        self.decisions = 0
+        self.cache_hits = 0
+
+    def count(self, clauses, num_vars, names=()):
+        """Returns the number of assignments of the variables 1, ..., num_vars that satisfy all clauses.
+        The variables in names (such as the atoms of a Tseitin transformation, see CNF.names) are decided first."""
+        clauses, units = normalize(clauses)
+        if clauses is None:
+            return 0
+        num_vars = max([num_vars] + [abs(literal) for clause in clauses for literal in clause] +
+                       [abs(literal) for literal in units])
+        residual = Residual(clauses, num_vars)
+        ids = [self.clause_ids.setdefault(clause, len(self.clause_ids)) for clause in clauses]
+        for literal in units:
+            if not residual.assign(literal):
+                return 0
+        free, parts = residual.components(range(1, num_vars + 1), names)
+        count = 1 << free
+
+        # the search runs on an explicit stack of generators, so its depth is not limited by the recursion limit.
+        for part in parts:
+            stack = [self._count(residual, names, ids, *part)]
+            value = None
+            while stack:
+                try:
+                    request = stack[-1].send(value)
+                except StopIteration as stop:
+                    stack.pop()
+                    value = stop.value
+                    continue
+                stack.append(self._count(residual, names, ids, *request))
+                value = None
+            count *= value
+            if not count:
+                return 0
+        return count
+
+    def _count(self, residual, names, ids, variables, clauses, variable):
+        """Generator that counts the models of a component (its variables and the indexes of its clauses),
+        deciding variable first. It yields the components it needs, as (variables, clauses, variable), and
+        receives their counts. Every literal it assigns is unassigned before it returns."""
+        # the unassigned literals of the clauses are those of the variables, so these identify the component.
+        key = (variables, tuple(sorted(ids[index] for index in clauses)))
+        count = self._lookup(key)
+        if count is not None:
+            return count
+        if len(clauses) == 1:  # a single clause is only false when all its literals are
+            count = (1 << len(variables)) - 1
+        elif len(variables) <= self.small_component:
+            count = self._count_small(residual, variables, clauses)
+        else:
+            self.decisions += 1
+            count = 0
+            for literal in (variable, -variable):
+                mark = len(residual.trail)
+                if residual.assign(literal):
+                    free, parts = residual.components(variables, names)
+                    result = 1 << free
+                    for part in parts:
+                        result *= yield part
+                        if not result:
+                            break
+                    count += result
+                residual.undo(mark)
+        self._store(key, count)
+        return count
+
+    def _count_small(self, residual, variables, clauses):
+        """Counts the models of a component with few variables: the assignments of its n variables are the bits
+        of integers of 2**n bits, and the models are those in which some literal of each clause is true."""
+        n = len(variables)
+        if n not in self.lanes:
+            self.lanes[n] = [sum(1 << i for i in range(1 << n) if i >> j & 1) for j in range(n)]
+        lanes = self.lanes[n]
+        full = (1 << (1 << n)) - 1
+        position = {variable: j for j, variable in enumerate(variables)}
+        models = full
+        for index in clauses:
+            mask = 0
+            for literal in residual.clauses[index]:
+                j = position.get(abs(literal))
+                if j is not None:  # the other literals of the clause are false
+                    mask |= lanes[j] if literal > 0 else full ^ lanes[j]
+            models &= mask
+        return bin(models).count('1')
+
+    def _lookup(self, key):
+        count = self.cache.get(key)
+        if count is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+        return count
+
+    def _store(self, key, count):
+        size = len(key[0]) + len(key[1])
+        if size > self.cache_size:
+            return
+        self.cache[key] = count
+        self.cached_size += size
+        while self.cached_size > self.cache_size:
+            old, _ = self.cache.popitem(last=False)
+            self.cached_size -= len(old[0]) + len(old[1])
+
+
+def count_models_cnf(cnf, **options):
+    """Returns the number of models of a CNF (see cnf.py) over its variables 1, ..., cnf.num_vars."""
+    return ModelCounter(**options).count(cnf, cnf.num_vars, cnf.names)
+
+
+def count_models(formula, **options):
+    """Returns the number of interpretations of the atoms of formula that satisfy it."""
+    return count_models_cnf(tseitin(formula, polarity=False), **options)
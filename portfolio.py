@@ -0,0 +1,182 @@
+"""The goal in this module is to decide the satisfiability of sets of clauses by running several strategies at
+the same time and keeping the first answer, since no single strategy is the fastest on every instance.
+
+Each strategy runs in its own process on the same clauses. As soon as one of them answers, the others are killed.
+The processes of a Portfolio are kept between calls of solve, and only the ones that were killed are started
+again, until close is called (a Portfolio is also a context manager that closes it). On a machine with a single
+core, where the strategies could only take turns, trivial instances (see IN_PROCESS_LITERALS) are solved by the
+CDCL solver in this process instead; with more cores, the strategies always race.
+The strategies are
+    - 'brute force': tries all assignments of the variables, the fastest for tiny instances;
+    - 'dpll': the DPLL procedure of dpll.py;
+    - 'cdcl luby', 'cdcl geometric' and 'cdcl no restarts': the CDCL solver of cdcl.py with different restart
+      policies;
+    - 'walksat': local search, which often finds models of large satisfiable instances quickly,
+      but cannot show that clauses are unsatisfiable.
+A Portfolio records how many times each strategy answered first, and for how long it ran.
+"""
+
+from collections import Counter
+from itertools import product
+import os
+import random
+import time
+
+from cdcl import Solver
+from cube_and_conquer import Worker, ready, terminate
+from dpll import dpll
+
+# instances with at most this number of variables are solved by brute force, without starting processes.
+BRUTE_FORCE_VARS = 10
+
+# on a single core, instances with at most this number of literals are solved by the CDCL solver, without
+# starting processes.
+IN_PROCESS_LITERALS = 1000
+
+
+# ---- strategies ----
+# each one receives the clauses and the number of variables, and returns a model (list of literals),
+# False if the clauses are unsatisfiable, or None if it gives up.
+
+def brute_force(clauses, num_vars):
+    for values in product((True, False), repeat=num_vars):
+        if all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in clauses):
+            return [variable if values[variable - 1] else -variable for variable in range(1, num_vars + 1)]
+    return False
+
+
+def cdcl(clauses, num_vars, restarts='luby'):
+    solver = Solver(restarts=restarts)
+    solver._ensure_var(num_vars)
+    solver.add_clauses(clauses)
+    if solver.solve():
+        return solver.model
+    return False
+
+
+def walksat(clauses, num_vars, noise=0.5, max_flips=1000000, seed=None):
+    """WalkSAT: starts from a random assignment and, while some clause is false, flips a variable of a random false
+    clause: with probability noise a random one, otherwise the one that makes fewest true clauses false."""
+    rng = random.Random(seed)
+    clauses = [list(clause) for clause in clauses]
+    if any(not clause for clause in clauses):
+        return False
+    value = [False] + [rng.random() < 0.5 for _ in range(num_vars)]
+    occurrences = [[] for _ in range(2 * num_vars + 2)]  # clauses of each literal, indexed by 2 * v + (literal < 0)
+    for index, clause in enumerate(clauses):
+        for literal in clause:
+            occurrences[2 * abs(literal) + (literal < 0)].append(index)
+    true_count = [sum(value[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses]
+    false_clauses = {index for index, count in enumerate(true_count) if count == 0}
+
+    def break_count(variable):  # number of clauses that become false if variable is flipped
+        code = 2 * variable + (not value[variable])  # the literal of variable that is true now
+        return sum(1 for index in occurrences[code] if true_count[index] == 1)
+
+    for _ in range(max_flips):
+        if not false_clauses:
+            return [variable if value[variable] else -variable for variable in range(1, num_vars + 1)]
+        clause = clauses[rng.choice(tuple(false_clauses))]
+        if rng.random() < noise:
+            variable = abs(rng.choice(clause))
+        else:
+            variable = min((abs(literal) for literal in clause), key=break_count)
+        made_false = 2 * variable + (not value[variable])
+        value[variable] = not value[variable]
+        for index in occurrences[made_false]:
+            true_count[index] -= 1
+            if not true_count[index]:
+                false_clauses.add(index)
+        for index in occurrences[made_false ^ 1]:
+            true_count[index] += 1
+            false_clauses.discard(index)
+    return None
+
+
+STRATEGIES = {
+    'brute force': (brute_force, {}),
+    'dpll': (dpll, {}),
+    'cdcl luby': (cdcl, {'restarts': 'luby'}),
+    'cdcl geometric': (cdcl, {'restarts': 'geometric'}),
+    'cdcl no restarts': (cdcl, {'restarts': None}),
+    'walksat': (walksat, {}),
+}
+
+
+def _run(name, clauses, num_vars):
+    function, options = STRATEGIES[name]
+    start = time.perf_counter()
+    result = function(clauses, num_vars, **options)
+    return name, result, time.perf_counter() - start
+
+
+class Portfolio:
+    """Runs strategies (names of STRATEGIES; by default, all of them) in parallel processes.
+    wins counts how many times each strategy answered first, and times adds the time it took.
+    in_process_literals is the size of the instances solved without processes on a single core."""
+
+    def __init__(self, strategies=None, in_process_literals=IN_PROCESS_LITERALS):
+        self.strategies = list(STRATEGIES if strategies is None else strategies)
+        self.in_process_literals = in_process_literals
+        self.wins = Counter()
+        self.times = Counter()
+        self.workers = {}  # strategy -> the Worker (see cube_and_conquer.py) that runs it, kept between calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        """Kills the processes of the strategies. The next call of solve starts them again."""
+        terminate(self.workers.values())
+        self.workers = {}
+
+    def solve(self, clauses, num_vars=0):
+        """Returns a model (list of literals) of the clauses, or None if they are unsatisfiable."""
+        clauses = [list(clause) for clause in clauses]
+        num_vars = max([num_vars] + [abs(literal) for clause in clauses for literal in clause])
+        if num_vars <= BRUTE_FORCE_VARS and 'brute force' in self.strategies:
+            name, result, seconds = _run('brute force', clauses, num_vars)
+            return self._record(name, result, seconds)
+        in_process = [name for name in self.strategies if name.startswith('cdcl')]
+        if (in_process and os.cpu_count() == 1 and
+                sum(len(clause) for clause in clauses) <= self.in_process_literals):
+            name, result, seconds = _run(in_process[0], clauses, num_vars)
+            return self._record(name, result, seconds)
+
+        busy = []
+        try:
+            for name in self.strategies:
+                if name not in self.workers:
+                    self.workers[name] = Worker(_run)
+                self.workers[name].submit((name, clauses, num_vars))
+                busy.append(self.workers[name])
+            while busy:
+                for worker in ready(busy):
+                    busy.remove(worker)
+                    name, result, seconds = worker.result()
+                    if result is not None:  # None is a strategy that gave up
+                        return self._record(name, result, seconds)
+            raise RuntimeError('every strategy of the portfolio gave up')
+        finally:  # the strategies still running are killed, and started again by the next call
+            for name, worker in list(self.workers.items()):
+                if worker in busy:
+                    del self.workers[name]
+                    worker.kill()
+
+    def _record(self, name, result, seconds):
+        self.wins[name] += 1
+        self.times[name] += seconds
+        return None if result is False else result
+
+
+# the portfolio used when none is given, so its statistics cover all such calls.
+default_portfolio = Portfolio()
+
+
+def solve_cnf_portfolio(cnf, portfolio=None):
+    """Returns a model (list of literals) of a CNF (see cnf.py), or None if it is unsatisfiable, with a portfolio
+    (by default, default_portfolio)."""
+    return (portfolio or default_portfolio).solve(cnf, cnf.num_vars)
@@ -0,0 +1,112 @@
+"""The goal in this module is to compile a formula into a flat program that can be evaluated
+many times without walking the formula objects.
+
+A compiled formula is a sequence of instructions in postfix order: every subformula is emitted
+once, after its immediate subformulas, so the last instruction computes the whole formula.
+Instruction i is described by opcodes[i] and by the operands stored in
+operands[starts[i]:starts[i + 1]]. The operand of an ATOM instruction is the slot of the atom,
+and the operands of a connective are the indexes of the instructions that compute its immediate subformulas
+(n-ary And and Or instructions have as many operands as the formula has arguments).
+For example, (p → (p ∨ s)) is compiled into
+
+    0: ATOM 0        (p)
+    1: ATOM 1        (s)
+    2: OR 0 1        (p ∨ s)
+    3: IMPLIES 0 2   (p → (p ∨ s))
+
+with atoms ['p', 's'], so an assignment is just a sequence of truth values indexed by slot.
+"""
+
+from array import array
+
+from formula import *
+from functions import postorder
+
+ATOM = 0
+NOT = 1
+AND = 2
+OR = 3
+IMPLIES = 4
+
+OPCODES = {Atom: ATOM, Not: NOT, And: AND, Or: OR, Implies: IMPLIES}
+
+
+class PostfixFormula:
+    """A formula compiled into postfix opcode and operand arrays.
+    atoms is the list of atom names, and slots maps each name to its position in that list."""
+
+    __slots__ = ('opcodes', 'operands', 'starts', 'atoms', 'slots')
+
+    def __init__(self, opcodes, operands, starts, atoms):
+        self.opcodes = opcodes
+        self.operands = operands
+        self.starts = starts
+        self.atoms = atoms
+        self.slots = {name: slot for slot, name in enumerate(atoms)}
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def assignment(self, interpretation):
+        """Converts an interpretation such as {'p': True, 'q': False} into a list indexed by slot."""
+        return [interpretation.get(name) for name in self.atoms]
+
+    def evaluate(self, interpretation):
+        """Determines the truth value of the compiled formula in an interpretation (dictionary)."""
+        return evaluate_postfix(self, self.assignment(interpretation))
+
+
+def compile_postfix(formula):
+    """Compiles a formula into a PostfixFormula.
+    Shared subformulas are compiled only once, and there is no limit on the depth of the formula."""
+
+    opcodes = array('b')
+    operands = array('l')
+    starts = array('l', [0])
+    atoms = []
+    slots = {}
+    index = {}  # subformula -> instruction that computes it
+    for current in postorder(formula):
+        if isinstance(current, Atom):
+            if current.name not in slots:
+                slots[current.name] = len(atoms)
+                atoms.append(current.name)
+            operands.append(slots[current.name])
+        else:
+            operands.extend(index[arg] for arg in current.args)
+        index[current] = len(opcodes)
+        opcodes.append(OPCODES[type(current)])
+        starts.append(len(operands))
+    return PostfixFormula(opcodes, operands, starts, atoms)
+
+
+def evaluate_postfix(program, values):
+    """Runs a PostfixFormula on an assignment, a sequence of truth values indexed by atom slot.
+    Returns the truth value of the compiled formula."""
+
+    operands = program.operands
+    starts = program.starts
+    results = [False] * len(program.opcodes)
+    i = 0
+    for opcode in program.opcodes:
+        start = starts[i]
+        if opcode == ATOM:
+            results[i] = values[operands[start]]
+        elif opcode == NOT:
+            results[i] = not results[operands[start]]
+        elif opcode == AND:
+            for j in range(start, starts[i + 1]):
+                value = results[operands[j]]
+                if not value:
+                    break
+            results[i] = value
+        elif opcode == OR:
+            for j in range(start, starts[i + 1]):
+                value = results[operands[j]]
+                if value:
+                    break
+            results[i] = value
+        else:
+            results[i] = not results[operands[start]] or results[operands[start + 1]]
+        i += 1
+    return results[-1]
@@ -0,0 +1,344 @@
+"""The goal in this module is to simplify sets of clauses (see cnf.py) before they are given to a SAT solver.
+
+The passes are
+    - unit propagation: the literals of unit clauses are made true, which removes the clauses they satisfy
+      and the opposite literals from the other clauses;
+    - equivalent literals: the binary clauses form an implication graph, and the literals of each strongly
+      connected component are equivalent, so all of them are replaced by one of them;
+    - subsumption: a clause that contains all the literals of another clause is removed, and self-subsuming
+      resolution removes literal ¬x from a clause D when another clause (C ∨ x) has C included in D.
+      Clauses are compared through the occurrence lists of their literals, and a signature (a bit mask of their
+      variables) rules out most pairs at once;
+    - bounded variable elimination: a variable is eliminated by replacing the clauses in which it occurs with all
+      their resolvents on it, when this does not increase the number of clauses.
+The result is equisatisfiable with the original clauses, and reconstruct extends a model of the result to a model
+of the original clauses. For example,
+
+    preprocessor = Preprocessor(cnf)
+    model = solve_cnf(preprocessor.cnf())
+    if model is not None:
+        model = preprocessor.reconstruct(model)
+    print(preprocessor.report())
+"""
+
+from cnf import CNF
+
+# a variable is not eliminated if a resolvent would have more literals than this.
+RESOLVENT_LENGTH = 16
+
+# maximum number of rounds of subsumption and variable elimination.
+ROUNDS = 3
+
+
+def _signature(clause):
+    signature = 0
+    for literal in clause:
+        signature |= 1 << (abs(literal) & 63)
+    return signature
+
+
+class Preprocessor:
+    """Simplifies clauses of DIMACS literals over the variables 1, ..., num_vars (by default, of a CNF).
+    Variables in frozen are neither eliminated nor replaced by equivalent literals, so they keep their meaning in
+    the simplified clauses (for example, to be used in assumptions). The passes run when the object is created;
+    stats has, for each pass, the numbers of clauses, literals and variables it removed."""
+
+    def __init__(self, clauses, num_vars=None, frozen=(), passes=('units', 'equivalences', 'subsumption',
+                                                                   'elimination')):
+        self.num_vars = clauses.num_vars if num_vars is None else num_vars
+        self.names = getattr(clauses, 'names', {})
+        self.frozen = set(frozen)
+        self.clauses = []  # clause index -> list of literals, or None if the clause was removed
+        self.signatures = []
+        self.occurrences = {}  # literal -> set of the indexes of the clauses in which it occurs
+        self.value = {}  # variable -> truth value fixed by unit propagation
+        self.units = []
+        self.touched = []  # indexes of new or strengthened clauses, to be checked for subsumption
+        self.stack = []  # eliminated and replaced variables, in order, to reconstruct models
+        self.unsatisfiable = False
+        self.stats = {}
+        for clause in clauses:
+            self.num_vars = max([self.num_vars] + [abs(literal) for literal in clause])
+            self._add(clause)
+        self._measure('units', self._propagate)
+        for _ in range(ROUNDS):
+            size = self._size()
+            if 'equivalences' in passes:
+                self._measure('equivalences', self._substitute_equivalences)
+            if 'subsumption' in passes:
+                self._measure('subsumption', self._subsume_all)
+            if 'elimination' in passes:
+                self._measure('elimination', self._eliminate_variables)
+            if self._size() == size or self.unsatisfiable:
+                break
+
+    # ---- clause database ----
+
+    def _add(self, clause):
+        literals = set()
+        for literal in clause:
+            value = self.value.get(abs(literal))
+            if value is None:
+                if -literal in literals:
+                    return  # tautology
+                literals.add(literal)
+            elif value == (literal > 0):
+                return  # satisfied
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.units.extend(literals)
+        else:
+            index = len(self.clauses)
+            self.clauses.append(sorted(literals, key=abs))
+            self.signatures.append(_signature(literals))
+            for literal in literals:
+                self.occurrences.setdefault(literal, set()).add(index)
+            self.touched.append(index)
+
+    def _remove(self, index):
+        for literal in self.clauses[index]:
+            self.occurrences[literal].discard(index)
+        self.clauses[index] = None
+
+    def _strengthen(self, index, literal):
+        """Removes literal from clause index."""
+        clause = self.clauses[index]
+        clause.remove(literal)
+        self.occurrences[literal].discard(index)
+        if len(clause) == 1:
+            self.units.append(clause[0])
+            self._remove(index)
+        else:
+            self.signatures[index] = _signature(clause)
+            self.touched.append(index)
+
+    def _occurrences(self, literal):
+        return self.occurrences.get(literal, ())
+
+    def _size(self):
+        clauses = [clause for clause in self.clauses if clause is not None]
+        variables = {abs(literal) for clause in clauses for literal in clause}
+        return len(clauses), sum(len(clause) for clause in clauses), len(variables)
+
+    def _measure(self, name, run):
+        before = self._size()
+        run()
+        after = self._size()
+        removed = self.stats.setdefault(name, {'clauses': 0, 'literals': 0, 'variables': 0})
+        for key, old, new in zip(('clauses', 'literals', 'variables'), before, after):
+            removed[key] += old - new
+
+    # ---- passes ----
+
+    def _propagate(self):
+        while self.units and not self.unsatisfiable:
+            literal = self.units.pop()
+            value = self.value.get(abs(literal))
+            if value is not None:
+                if value != (literal > 0):
+                    self.unsatisfiable = True
+                continue
+            self.value[abs(literal)] = literal > 0
+            for index in list(self._occurrences(literal)):
+                self._remove(index)
+            for index in list(self._occurrences(-literal)):
+                self._strengthen(index, -literal)
+
+    def _subsume(self, index):
+        clause = self.clauses[index]
+        if clause is None:
+            return
+        signature = self.signatures[index]
+        best = min(clause, key=lambda literal: len(self._occurrences(literal)) + len(self._occurrences(-literal)))
+        for other in list(self._occurrences(best)) + list(self._occurrences(-best)):
+            target = self.clauses[other]
+            if other == index or target is None or len(target) < len(clause) or \
+                    signature & ~self.signatures[other]:
+                continue
+            target_literals = set(target)
+            flipped = None
+            for literal in clause:
+                if literal in target_literals:
+                    continue
+                if flipped is None and -literal in target_literals:
+                    flipped = literal
+                    continue
+                break
+            else:
+                if flipped is None:
+                    self._remove(other)  # subsumed
+                else:
+                    self._strengthen(other, -flipped)  # self-subsuming resolution
+                    if self.clauses[index] is None:
+                        return
+
+    def _subsume_all(self):
+        queue = sorted((index for index, clause in enumerate(self.clauses) if clause is not None),
+                       key=lambda index: len(self.clauses[index]))
+        self.touched = []
+        while queue and not self.unsatisfiable:
+            for index in queue:
+                self._subsume(index)
+            self._propagate()
+            queue, self.touched = self.touched, []
+
+    def _eliminate_variables(self):
+        variables = {abs(literal) for clause in self.clauses if clause is not None for literal in clause}
+        order = sorted(variables - self.frozen,
+                       key=lambda variable: len(self._occurrences(variable)) + len(self._occurrences(-variable)))
+        for variable in order:
+            if self.unsatisfiable:
+                return
+            if variable in self.value:
+                continue
+            positive = [self.clauses[index] for index in self._occurrences(variable)]
+            negative = [self.clauses[index] for index in self._occurrences(-variable)]
+            limit = len(positive) + len(negative)
+            if not limit:
+                continue
+            resolvents = []
+            for first in positive:
+                for second in negative:
+                    resolvent = set(first)
+                    resolvent.discard(variable)
+                    if any(-literal in resolvent for literal in second if literal != -variable):
+                        continue  # tautology
+                    resolvent.update(literal for literal in second if literal != -variable)
+                    if len(resolvent) > RESOLVENT_LENGTH:
+                        break
+                    resolvents.append(resolvent)
+                else:
+                    continue
+                break
+            else:
+                if len(resolvents) <= limit:
+                    self.stack.append(('eliminated', variable, [list(clause) for clause in positive + negative]))
+                    for index in list(self._occurrences(variable)) + list(self._occurrences(-variable)):
+                        self._remove(index)
+                    for resolvent in resolvents:
+                        self._add(resolvent)
+                    self._propagate()
+
+    def _substitute_equivalences(self):
+        # the implication graph has an edge ¬a → b and ¬b → a for each binary clause (a ∨ b).
+        edges = {}
+        for clause in self.clauses:
+            if clause is not None and len(clause) == 2:
+                first, second = clause
+                edges.setdefault(-first, []).append(second)
+                edges.setdefault(-second, []).append(first)
+        replacement = {}  # literal -> equivalent literal that replaces it
+        for component in _strongly_connected_components(edges):
+            if len(component) < 2 or any(literal in replacement for literal in component):
+                continue
+            members = set(component)
+            if any(-literal in members for literal in members):
+                self.unsatisfiable = True
+                return
+            representative = min(component, key=lambda literal: (abs(literal) not in self.frozen, abs(literal)))
+            for literal in component:
+                if literal != representative and abs(literal) not in self.frozen:
+                    replacement[literal] = representative
+                    replacement[-literal] = -representative
+                    self.stack.append(('equivalent', abs(literal), representative if literal > 0 else -representative))
+        if not replacement:
+            return
+        indexes = set()
+        for literal in replacement:
+            indexes.update(self._occurrences(literal))
+        for index in indexes:
+            clause = self.clauses[index]
+            self._remove(index)
+            self._add([replacement.get(literal, literal) for literal in clause])
+        self._propagate()
+
+    # ---- results ----
+
+    def cnf(self):
+        """Returns the simplified clauses as a CNF over the same variables (and names) as the original clauses."""
+        cnf = CNF(self.num_vars)
+        cnf.names = dict(self.names)
+        cnf.variables = {name: variable for variable, name in self.names.items()}
+        if self.unsatisfiable:
+            cnf.add_clause([])
+            return cnf
+        for clause in self.clauses:
+            if clause is not None:
+                cnf.add_clause(clause)
+        for variable in sorted(self.frozen):  # the values of frozen variables fixed by unit propagation are kept
+            if variable in self.value:
+                cnf.add_clause([variable if self.value[variable] else -variable])
+        return cnf
+
+    def reconstruct(self, model):
+        """Extends a model (list of literals) of the simplified clauses to a model of the original clauses."""
+        value = {abs(literal): literal > 0 for literal in model}
+        value.update(self.value)
+
+        def is_true(literal):
+            return value.get(abs(literal), False) == (literal > 0)
+
+        for step, variable, data in reversed(self.stack):
+            if step == 'equivalent':
+                value[variable] = is_true(data)
+            else:
+                value[variable] = False
+                for clause in data:
+                    if variable in clause and not any(is_true(literal) for literal in clause if literal != variable):
+                        value[variable] = True
+                        break
+        return [variable if value.get(variable, False) else -variable for variable in range(1, self.num_vars + 1)]
+
+    def report(self):
+        """Returns a text with the numbers of clauses, literals and variables removed by each pass."""
+        return '\n'.join('%s: -%d clauses, -%d literals, -%d variables' %
+                         (name, removed['clauses'], removed['literals'], removed['variables'])
+                         for name, removed in self.stats.items())
+
+
+def _strongly_connected_components(edges):
+    """Returns the strongly connected components of a directed graph given by adjacency lists (Tarjan's algorithm,
+    with an explicit stack)."""
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    for root in list(edges):
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, position = work.pop()
+            if position == 0:
+                index[node] = low[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+            successors = edges.get(node, ())
+            if position < len(successors):
+                work.append((node, position + 1))
+                successor = successors[position]
+                if successor not in index:
+                    work.append((successor, 0))
+                elif successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+                continue
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return components
+
+
+def preprocess(cnf, frozen=()):
+    """Returns a Preprocessor of the clauses of a CNF; its method cnf gives the simplified CNF."""
+    return Preprocessor(cnf, frozen=frozen)
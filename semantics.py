@@ -1,95 +1,253 @@
 """The goal in this module is to define functions associated with the semantics of formulas in propositional logic. """
 
 
+from heapq import heappop, heappush
+from itertools import product
+
 from formula import *
-from functions import atoms
+from functions import atoms, postorder
+from bitparallel import all_models_bitparallel
+from cdcl import solve_cnf
+from cube_and_conquer import solve_cnf_parallel
+from dpll import dpll
+from formula_compiler import compile_formula, evaluator
+from knowledge_base import KnowledgeBase
+from model_counting import count_models
+from portfolio import solve_cnf_portfolio
+from preprocess import Preprocessor
+from tseitin import tseitin
 
 
 def truth_value(formula, interpretation):
     """Determines the truth value of a formula in an interpretation (valuation).
     An interpretation may be defined as dictionary. For example, {'p': True, 'q': False}.
+    A formula that is evaluated more than a few times, and is not too large, is compiled (see formula_compiler.py),
+    and from then on its truth value is computed by the compiled function. The others are evaluated in
+    postfix order (see postfix.py), so the result never depends on the depth of the formula.
     """
-    if isinstance(formula, Atom):
-        return interpretation.get(formula.name) # the name of the atom is also the name of the key in the dictionary.
-    if isinstance(formula, Not):
-        if isinstance(formula.inner, Atom):
-            return not interpretation.get(formula.inner.name)
-        else:
-            return not truth_value(formula.inner, interpretation)
-    if isinstance(formula, And):
-        return truth_value(formula.left, interpretation) and truth_value(formula.right, interpretation)
-    if isinstance(formula, Or):
-        return truth_value(formula.left, interpretation) or truth_value(formula.right, interpretation)
-    if isinstance(formula, Implies):
-        return not truth_value(formula.left, interpretation) or truth_value(formula.right, interpretation)
+    return evaluator(formula).evaluate(interpretation)
 
 
 def partial_truth_value(formula, interpretation):
-    if isinstance(formula, Atom):
-        if type(interpretation.get(formula.name)) == type(True):
-            return interpretation.get(formula.name)
-        else:
-            return None
+    """Determines the truth value of a formula in a partial interpretation, with the three-valued logic of Kleene:
+    the result is True or False if the atoms in the interpretation already decide it, and None otherwise.
+    Atoms missing from the interpretation, or whose value is not a bool, are unknown (None).
+    The arguments of a connective are evaluated from left to right, and the evaluation stops as soon as one of them
+    decides the result (a false conjunct, a true disjunct, a false antecedent). Each distinct subformula is
+    evaluated at most once."""
 
-    if isinstance(formula, Not):
-        if isinstance(formula.inner, Atom):
-            if type(interpretation.get(formula.inner.name)) == type(True):
-                return not interpretation.get(formula.inner.name)
-            else:
-                return None
-        else:
-            return not partial_truth_value(formula.inner, interpretation)
+    memo = {}
+    stack = [[formula, 0, False]]  # subformula, next argument to evaluate, whether some argument is unknown
+    while stack:
+        frame = stack[-1]
+        current, index, unknown = frame
+        if current in memo:
+            stack.pop()
+            continue
+        if isinstance(current, Atom):
+            value = interpretation.get(current.name)
+            memo[current] = value if type(value) == bool else None
+            stack.pop()
+            continue
+        args = current.args
+        if index == len(args):
+            # no argument decided the result: a conjunction is true and a disjunction (or implication) is false.
+            memo[current] = None if unknown else isinstance(current, And)
+            stack.pop()
+            continue
+        arg = args[index]
+        if arg not in memo:
+            stack.append([arg, 0, False])
+            continue
+        value = memo[arg]
+        if isinstance(current, Not):
+            memo[current] = None if value is None else not value
+            stack.pop()
+            continue
+        if isinstance(current, Implies) and index == 0 and value is not None:
+            value = not value  # (A → B) is evaluated as (¬A ∨ B)
+        decisive = not isinstance(current, And)  # the value of an argument that decides the result
+        if value is decisive:
+            memo[current] = decisive
+            stack.pop()
+            continue
+        frame[1] = index + 1
+        frame[2] = unknown or value is None
+    return memo[formula]
 
-    if isinstance(formula, And):
-        sub1 = partial_truth_value(formula.left, interpretation)
-        sub2 = partial_truth_value(formula.right, interpretation)
 
-        if sub1 == True and sub2 == True:
-            return True
-        elif sub1 == False or sub2 == False:
-            return False
-        else:
-            return None
+class PartialEvaluator:
+    """Keeps the three-valued truth values (see partial_truth_value) of all subformulas of a formula under a partial
+    interpretation that changes one atom at a time, as in a search that assigns atoms and undoes assignments.
+    Each connective keeps the number of its arguments that are true and false, so a change only updates the
+    subformulas whose value actually changes. All atoms start unknown."""
 
-    if isinstance(formula, Or):
-        sub1 = partial_truth_value(formula.left, interpretation)
-        sub2 = partial_truth_value(formula.right, interpretation)
+    def __init__(self, formula):
+        self.nodes = postorder(formula)
+        index = {node: i for i, node in enumerate(self.nodes)}
+        self.atom_index = {node.name: i for i, node in enumerate(self.nodes) if isinstance(node, Atom)}
+        self.inner = [index[node.inner] if isinstance(node, Not) else None for node in self.nodes]
+        self.parents = [[] for _ in self.nodes]  # (parent, position of the argument) for each occurrence
+        for i, node in enumerate(self.nodes):
+            for position, arg in enumerate(node.args):
+                self.parents[index[arg]].append((i, position))
+        self.values = [None] * len(self.nodes)
+        self.true_args = [0] * len(self.nodes)  # arguments of each connective that are true (false) in it
+        self.false_args = [0] * len(self.nodes)
+        self.interpretation = {}
+        self._queued = set()
 
-        if sub1 == True or sub2 == True:
-            return True
-        elif sub1 == False and sub2 == False:
-            return False
-        else:
-            return None
+    @property
+    def value(self):
+        """The truth value of the whole formula: True, False or None (unknown)."""
+        return self.values[-1]
 
-    if isinstance(formula, Implies):
-        sub1 = partial_truth_value(formula.left, interpretation)
-        sub2 = partial_truth_value(formula.right, interpretation)
+    def _contribution(self, parent, position, value):
+        # the value an argument adds to the counters of its parent; (A → B) is counted as (¬A ∨ B).
+        if value is not None and position == 0 and isinstance(self.nodes[parent], Implies):
+            return not value
+        return value
 
-        if sub1 == False or sub2 == True:
+    def _compute(self, i):
+        node = self.nodes[i]
+        if isinstance(node, Not):
+            value = self.values[self.inner[i]]
+            return None if value is None else not value
+        size = len(node.args)
+        if isinstance(node, And):
+            if self.false_args[i]:
+                return False
+            return True if self.true_args[i] == size else None
+        if self.true_args[i]:
             return True
-        elif sub1 == True and sub2 == False:
-            return False
+        return False if self.false_args[i] == size else None
+
+    def assign(self, name, value):
+        """Sets the value of atom name (True, False, or None to make it unknown again) and updates the subformulas.
+        Atoms that do not occur in the formula are ignored. Returns the new value of the formula."""
+        i = self.atom_index.get(name)
+        if i is None:
+            return self.value
+        if value is None:
+            self.interpretation.pop(name, None)
         else:
-            return None
+            self.interpretation[name] = value
+        queue = []
+        self._set(i, value, queue)
+        # subformulas are processed in postorder, so each one is recomputed at most once.
+        while queue:
+            i = heappop(queue)
+            if i in self._queued:
+                self._queued.discard(i)
+                self._set(i, self._compute(i), queue)
+        return self.value
+
+    def _set(self, i, value, queue):
+        old = self.values[i]
+        if value is old:
+            return
+        self.values[i] = value
+        for parent, position in self.parents[i]:
+            before = self._contribution(parent, position, old)
+            after = self._contribution(parent, position, value)
+            if before is True:
+                self.true_args[parent] -= 1
+            elif before is False:
+                self.false_args[parent] -= 1
+            if after is True:
+                self.true_args[parent] += 1
+            elif after is False:
+                self.false_args[parent] += 1
+            if parent not in self._queued:
+                self._queued.add(parent)
+                heappush(queue, parent)
 
 
 def is_logical_consequence(premises, conclusion):  # function TT-Entails? in the book AIMA.
-    """Returns True if the conclusion is a logical consequence of the set of premises. Otherwise, it returns False."""
-    pass
-    # ======== YOUR CODE HERE ========
+    """Returns True if the conclusion is a logical consequence of the set of premises. Otherwise, it returns False.
+    To check many conclusions against the same premises, use a KnowledgeBase (see knowledge_base.py),
+    which keeps the premises and what it learned between queries."""
+    return KnowledgeBase(premises).entails(conclusion)
+
+
+def is_logical_equivalence(formula1, formula2, manager=None):
+    """Checks whether formula1 and formula2 are logically equivalent.
+    If manager is a BDD manager (see bdd.py), both formulas are built as BDDs in it and compared, which is
+    cheap when the same formulas, or formulas that share subformulas, are compared many times."""
+    if manager is not None:
+        return manager.from_formula(formula1) is manager.from_formula(formula2)
+    knowledge_base = KnowledgeBase()
+    return knowledge_base.entails(Implies(formula1, formula2)) and knowledge_base.entails(Implies(formula2, formula1))
+
+
+def is_valid(formula, workers=None):
+    """Returns True if formula is a logically valid (tautology). Otherwise, it returns False
+    If workers is given, the search for an interpretation that falsifies formula is split among workers
+    processes (see cube_and_conquer.py)."""
+    if workers is not None:
+        return solve_cnf_parallel(tseitin(Not(formula)), workers) is None
+    return KnowledgeBase().entails(formula)
+
+
+def backbone(premises, atoms=None):
+    """Returns the list of the literals (atoms or negations of atoms) that are true in every model of the premises,
+    that is, the literals that are logical consequences of the premises, or False if the premises are unsatisfiable.
+    Only the given atoms are considered; by default, all atoms of the premises.
+    It costs a few calls to the SAT solver instead of one call of is_logical_consequence per literal
+    (see KnowledgeBase.backbone)."""
+    return KnowledgeBase(premises).backbone(atoms)
+
+
+def satisfiability(formula, workers=None, preprocess=False):
+    """Checks whether formula is satisfiable, like satisfiability_brute_force, but with the CDCL solver
+    of cdcl.py instead of trying all interpretations. The formula is first transformed into clauses (see tseitin.py).
+    If preprocess is True, the clauses are simplified before solving (see preprocess.py).
+    If workers is given, the clauses are split into cubes that are solved in parallel by workers processes
+    (see cube_and_conquer.py).
+    If the input formula is satisfiable, it returns an interpretation that assigns true to the formula.
+    Otherwise, it returns False."""
+
+    cnf = tseitin(formula)
+    clauses = cnf
+    if preprocess:
+        preprocessor = Preprocessor(cnf)
+        clauses = preprocessor.cnf()
+    if workers is not None:
+        model = solve_cnf_parallel(clauses, workers)
+    else:
+        model = solve_cnf(clauses)
+    if model is None:
+        return False
+    if preprocess:
+        model = preprocessor.reconstruct(model)
+    return cnf.interpretation(model)
+
+
+def satisfiability_portfolio(formula, portfolio=None):
+    """Checks whether formula is satisfiable, like satisfiability, but running several strategies (brute force,
+    CDCL with different restart policies and local search) in parallel processes and keeping the first answer
+    (see portfolio.py). If the input formula is satisfiable, it returns an interpretation that assigns true to the
+    formula. Otherwise, it returns False."""
 
+    cnf = tseitin(formula)
+    model = solve_cnf_portfolio(cnf, portfolio)
+    if model is None:
+        return False
+    return cnf.interpretation(model)
 
-def is_logical_equivalence(formula1, formula2):
-    """Checks whether formula1 and formula2 are logically equivalent."""
-    pass
-    # ======== YOUR CODE HERE ========
 
+def satisfiability_dpll(formula):
+    """Checks whether formula is satisfiable, like satisfiability_brute_force, but with the DPLL procedure of dpll.py
+    on the clauses of formula (see tseitin.py), which is cut early by evaluating formula in the partial interpretation
+    of the search (see PartialEvaluator).
+    If the input formula is satisfiable, it returns an interpretation that assigns true to the formula.
+    Otherwise, it returns False."""
 
-def is_valid(formula):
-    """Returns True if formula is a logically valid (tautology). Otherwise, it returns False"""
-    pass
-    # ======== YOUR CODE HERE ========
+    cnf = tseitin(formula)
+    model = dpll(cnf, cnf.num_vars, PartialEvaluator(formula), cnf.names)
+    if model is False:
+        return False
+    return cnf.interpretation(model)
 
 
 def satisfiability_brute_force(formula):
@@ -100,12 +258,15 @@ def satisfiability_brute_force(formula):
     vars = atoms(formula) # coleta das atômicas
     values = {}
 
-    return sat_check(vars, formula, values)
+    return sat_check(vars, compile_formula(formula), values)
 
 
 def sat_check(vars, formula, values):
+    if isinstance(formula, Formula):
+        formula = compile_formula(formula)
+
     if not len(vars): 
-       if truth_value(formula, values):
+       if formula.evaluate(values):
            return values
        return False
 
@@ -140,31 +301,70 @@ def duplo_satisfativel(formula):
     return True
 """
 
-def all_models(formula):
-    vars = atoms(formula) # coleta das atômicas.
-    tam = 2**len(vars) # quantidade de valorações possíveis.
-    
-    interpretation = {} # dicionário de valorações.
-    
-    # "Setando" todas as variáveis em True.
-    for i in range(0, len(vars)):
-        temp = vars.pop()
-        interpretation[temp] = True
-    
-    # Ordenar as atômicas para melhor visualização.
-    interpretation = dict(sorted(interpretation.items()))
-    # Também é necessário para o laço interno.
-    
-    true_interpretation = [] # lista para armazenar as valorações
-    
-    for i in range(0, tam):
-        if truth_value(formula, interpretation):
-            true_interpretation.append(interpretation.copy())
-    
-        for j, (k, v) in enumerate(interpretation.items()):
-            if j == 0:
-                interpretation[k] = not interpretation[k]
-            elif not (i + 1) % (tam / 2**j):
-                interpretation[k] = not interpretation[k]
+def all_models(formula, manager=None):
+    """Returns the list of all models of formula, that is, the interpretations of its atoms that satisfy it.
+    The formula is evaluated over blocks of interpretations at once (see bitparallel.py), or, if manager is
+    a BDD manager (see bdd.py), the models are read from the BDD of formula.
+    To go through the models one at a time, or to project them onto some atoms, use iter_models, which finds them
+    with the SAT solver, or gray_code_models (see gray_code.py), which uses constant memory.
+    To only know how many models there are, use count_models (see model_counting.py), which does not list them."""
+    if manager is not None:
+        return list(manager.models(manager.from_formula(formula), sorted(atoms(formula))))
+    return list(all_models_bitparallel(formula))
 
-    return true_interpretation
\ No newline at end of file
+
+def iter_models(formula, project=None):
+    """Yields the models of formula as dictionaries, one at a time, using the SAT solver.
+    If project is a list of atoms (or atom names), each model is restricted to those atoms and every restricted model
+    is yielded once; projected atoms that do not occur in formula take both truth values.
+
+    After each solution, the projected atoms whose values do not matter (formula stays true, by partial evaluation,
+    whatever their values) are dropped, all the models of the remaining partial interpretation are yielded, and a
+    clause blocking all of them is added to the solver. So the number of calls to the solver is at most the number
+    of models, and often much smaller."""
+
+    if project is None:
+        names = sorted(atoms(formula))
+    else:
+        names = [atom.name if isinstance(atom, Atom) else atom for atom in project]
+    knowledge_base = KnowledgeBase([formula])
+    variables = knowledge_base.variables
+    formula_atoms = atoms(formula)
+    fixed = [name for name in names if name in formula_atoms]  # projected atoms decided by the solver
+    free = [name for name in names if name not in formula_atoms]
+    evaluator = PartialEvaluator(formula)
+    blocking = []  # blocking clauses, as lists of DIMACS literals
+    occurrences = {}  # literal -> indexes of the blocking clauses in which it occurs
+    solver = knowledge_base.solver
+    while solver.solve():
+        model = solver.model
+        for name in formula_atoms:
+            evaluator.assign(name, model[variables[name] - 1] > 0)
+        # cube: the literals of the projected atoms that are kept. A literal can be dropped if formula stays true
+        # and the cube still contradicts every previous cube, so that no model is yielded twice.
+        cube = {model[variables[name] - 1] for name in fixed}
+        support = [sum(literal in cube for literal in clause) for clause in blocking]  # literals of each clause in cube
+        for name in fixed:
+            literal = model[variables[name] - 1]
+            if any(support[index] == 1 for index in occurrences.get(literal, ())):
+                continue
+            evaluator.assign(name, None)
+            if evaluator.value is True:
+                cube.discard(literal)
+                for index in occurrences.get(literal, ()):
+                    support[index] -= 1
+            else:
+                evaluator.assign(name, literal > 0)
+        values = {abs(literal): literal > 0 for literal in cube}
+        dropped = [name for name in fixed if variables[name] not in values] + free
+        for extension in product((True, False), repeat=len(dropped)):
+            interpretation = dict(zip(dropped, extension))
+            yield {name: interpretation[name] if name in interpretation else values[variables[name]]
+                   for name in names}
+        if not cube:
+            return
+        clause = [-literal for literal in cube]
+        for literal in clause:
+            occurrences.setdefault(literal, []).append(len(blocking))
+        blocking.append(clause)
+        solver.add_clause(clause)
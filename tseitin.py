@@ -0,0 +1,156 @@
+"""The goal in this module is to transform any formula into an equisatisfiable set of clauses
+of linear size (see cnf.py), with the Tseitin transformation and the polarity optimisation of Plaisted and Greenbaum.
+
+Each subformula that is not a literal gets an auxiliary variable x together with clauses stating that x is
+equivalent to the subformula. For example, for (p ∧ q) the clauses are
+
+    (¬x ∨ p), (¬x ∨ q)      x → (p ∧ q)
+    (x ∨ ¬p ∨ ¬q)           (p ∧ q) → x
+
+With the polarity optimisation, a subformula that only occurs positively (under an even number of negations)
+only needs the first group of clauses, and one that only occurs negatively only needs the second one.
+The result is equisatisfiable with the formula, and the models of the clauses restricted to the atoms
+are models of the formula. With polarity=False, both groups are always generated, so every model of the
+formula extends to exactly one model of the clauses (which preserves the number of models).
+
+Identical subformulas share their auxiliary variable, since formulas are hash-consed.
+"""
+
+from cnf import CNF
+from formula import *
+
+POSITIVE = 1
+NEGATIVE = 2
+BOTH = POSITIVE | NEGATIVE
+
+
+def _flip(polarity):
+    return ((polarity & POSITIVE) << 1) | ((polarity & NEGATIVE) >> 1)
+
+
+def _child_polarities(formula, polarity):
+    if isinstance(formula, Not):
+        return (_flip(polarity),)
+    if isinstance(formula, Implies):
+        return _flip(polarity), polarity
+    return (polarity,) * len(formula.args)
+
+
+class TseitinEncoder:
+    """Encodes formulas into the clauses of a CNF (or of any object with the methods new_var, variable and
+    add_clause, such as a solver wrapper). The encoder remembers the variables and clauses it already created,
+    so it can be used incrementally: encoding more formulas only adds the clauses that are missing."""
+
+    def __init__(self, cnf=None, polarity=True):
+        self.cnf = CNF() if cnf is None else cnf
+        self.polarity = polarity
+        self.literals = {}  # formula -> integer literal that represents it
+        self.encoded = {}  # formula -> polarities whose clauses were already added
+
+    def literal(self, formula, polarity=BOTH):
+        """Returns an integer literal that represents formula, adding the clauses that define it.
+        With polarity POSITIVE, the literal only implies the formula; with NEGATIVE, it is only implied by it."""
+
+        if not self.polarity:
+            polarity = BOTH
+        encoded = self.encoded
+
+        # first, the polarities each subformula is still missing, from the formula down to the atoms.
+        missing = {}
+        stack = [(formula, polarity)]
+        while stack:
+            current, needed = stack.pop()
+            new = needed & ~encoded.get(current, 0) & ~missing.get(current, 0)
+            if not new:
+                continue
+            missing[current] = missing.get(current, 0) | new
+            for arg, arg_polarity in zip(current.args, _child_polarities(current, new)):
+                stack.append((arg, arg_polarity))
+
+        # then, the clauses, from the atoms up to the formula.
+        stack = [(formula, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current not in missing:
+                continue
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((arg, False) for arg in current.args if arg in missing)
+                continue
+            self._encode(current, missing.pop(current))
+        return self.literals[formula]
+
+    def _encode(self, formula, polarity):
+        self.encoded[formula] = self.encoded.get(formula, 0) | polarity
+        literals = self.literals
+        if isinstance(formula, Atom):
+            literals[formula] = self.cnf.variable(formula.name)
+            return
+        if isinstance(formula, Not):
+            literals[formula] = -literals[formula.inner]
+            return
+        x = literals.get(formula)
+        if x is None:
+            x = literals[formula] = self.cnf.new_var()
+        args = [literals[arg] for arg in formula.args]
+        add_clause = self.cnf.add_clause
+        if isinstance(formula, And):
+            if polarity & POSITIVE:
+                for arg in args:
+                    add_clause([-x, arg])
+            if polarity & NEGATIVE:
+                add_clause([x] + [-arg for arg in args])
+        elif isinstance(formula, Or):
+            if polarity & POSITIVE:
+                add_clause([-x] + args)
+            if polarity & NEGATIVE:
+                for arg in args:
+                    add_clause([x, -arg])
+        else:  # Implies
+            left, right = args
+            if polarity & POSITIVE:
+                add_clause([-x, -left, right])
+            if polarity & NEGATIVE:
+                add_clause([x, left])
+                add_clause([x, -right])
+
+    def _clause(self, formula):
+        """Returns the clause of a formula that is a literal, a disjunction of literals or the negation of a
+        conjunction of literals, or None for other formulas."""
+        if isinstance(formula, Or):
+            args, sign = formula.args, 1
+        elif isinstance(formula, Not) and isinstance(formula.inner, And):
+            args, sign = formula.inner.args, -1
+        else:
+            args, sign = (formula,), 1
+        clause = []
+        for arg in args:
+            if isinstance(arg, Atom):
+                clause.append(sign * self.cnf.variable(arg.name))
+            elif isinstance(arg, Not) and isinstance(arg.inner, Atom):
+                clause.append(-sign * self.cnf.variable(arg.inner.name))
+            else:
+                return None
+        return clause
+
+    def add(self, formula):
+        """Adds clauses stating that formula is true. The conjuncts of a (nested) conjunction are added separately,
+        and conjuncts that are already clauses are added as they are, without auxiliary variables."""
+        stack = [formula]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, And):
+                stack.extend(reversed(current.args))
+                continue
+            clause = self._clause(current)
+            if clause is None:
+                clause = [self.literal(current, POSITIVE)]
+            self.cnf.add_clause(clause)
+
+
+def tseitin(formula, polarity=True):
+    """Returns a CNF equisatisfiable with formula. The atoms of formula are the named variables of the CNF
+    (see CNF.names and CNF.variables); the other variables are auxiliary."""
+    encoder = TseitinEncoder(polarity=polarity)
+    encoder.add(formula)
+    return encoder.cnf